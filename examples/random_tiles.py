@@ -3,50 +3,23 @@ import math
 
 import p5
 
-from tactile import IsohedralTiling, tiling_types, EdgeShape, mul, Point
+from tactile import EdgeShape, mul, Point
+from tactile import RandomTilingGenerator, make_tiling
 
 RENDER_WIDTH = 1000
 RENDER_HEIGHT = 1000
 
+generator = RandomTilingGenerator()
+
 
 def make_random_tiling():
-    # Construct a tiling
-    tiling = IsohedralTiling(random.choice(tiling_types))
-
-    # Randomize the tiling vertex parameters
-    ps = tiling.parameters
-    for i in range(tiling.num_parameters):
-        ps[i] += (random.random()-.5)*0.2
-    tiling.parameters = ps
-
-    # Make some random edge shapes.  Note that here, we sidestep the 
-    # potential complexity of using .shapes vs. .parts by checking
-    # ahead of time what the intrinsic edge shape is and building
-    # Bezier control points that have all necessary symmetries.
+    # Construct a tiling with randomized vertex parameters and random
+    # edge shapes.  RandomTilingGenerator builds Bezier control points
+    # that have all necessary symmetries for each intrinsic edge shape.
     # See https://github.com/isohedral/tactile-js/ for more info.
+    tiling = make_tiling(generator.sample())
 
-    edges = []
-    for shp in tiling.edge_shapes:
-        ej = []
-        if shp == EdgeShape.I:
-            # Must be a straight line.
-            pass
-        elif shp == EdgeShape.J:
-            # Anything works for J
-            ej.append(Point(random.random()*0.6, random.random() - 0.5))
-            ej.append(Point(random.random()*0.6 + 0.4, random.random() - 0.5))
-        elif shp == EdgeShape.S:
-            # 180-degree rotational symmetry
-            ej.append(Point(random.random()*0.6, random.random() - 0.5))
-            ej.append(Point(1.0 - ej[0].x, -ej[0].y))
-        elif shp == EdgeShape.U:
-            # Symmetry after reflecting/flipping across length.
-            ej.append(Point(random.random()*0.6, random.random() - 0.5))
-            ej.append(Point(1.0 - ej[0].x, ej[0].y))
-
-        edges.append( ej )
-
-    return tiling, edges
+    return tiling, tiling.edge_curves
 
 
 def draw_random_tiling(tx=0, ty=0, scale=100):
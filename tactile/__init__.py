@@ -1,3 +1,13 @@
 #!/usr/bin/env python
 # -*- encoding: utf-8 -*-
-from .tactile import IsohedralTiling, tiling_types, EdgeShape, mul, Point
\ No newline at end of file
+from .tactile import IsohedralTiling, tiling_types, EdgeShape, DetailLevel, TileBlock, mul, Point
+from .tactile import TilingCache, TilingState, tiling_cache
+from .batch import TileBatch
+from .mesh import TileMesh, Mesh, write_obj, write_stl, write_gltf
+from .random_tiling import RandomTiling, RandomTilingGenerator, make_tiling, generate_random_tilings
+from .escher import escherize, shape_distance, EscherResult
+from .turning import TurningFunction, turning_functions, pairwise_distances
+from .shape_index import ShapeIndex, shape_embedding
+from .pattern import translational_unit, svg_pattern, pdf_pattern, json_pattern
+from .animation import TilingAnimation, AnimationFrame
+from .raster import render_png
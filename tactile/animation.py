@@ -0,0 +1,112 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import Point
+from .tactile import _check_dtype, _restore_tiling
+
+from array import array
+from collections import namedtuple
+from typing import List
+import math
+
+
+AnimationFrame = namedtuple('AnimationFrame', [
+    'index',
+    'parameters',
+    'vertices',
+    'edges',
+    'aspects',
+    't1',
+    't2',
+    'outline',
+    ])
+
+
+class TilingAnimation:
+
+    # Vertices, edge transforms, aspects, translations and (for fixed edge
+    # curves) outlines are all affine in the tiling parameters, so blending
+    # the geometry of two keyframes is exactly the geometry of the blended
+    # parameters.  Keyframe geometry is evaluated once up front and every
+    # frame is a linear interpolation of flat coefficient lists.
+
+    def __init__(self, tiling, keyframes: List[List[float]], frames: int, outlines: bool = False, steps: int = 8):
+        if not keyframes:
+            raise ValueError("At least one keyframe must be passed.")
+        if frames < 1:
+            raise ValueError(f"The number of frames must be positive, but {frames} was passed.")
+
+        self.frames = frames
+        self.outlines = outlines
+
+        scratch = _restore_tiling(tiling.tiling_type, list(tiling.parameters), tiling.edge_curves)
+        self._nv = scratch.num_vertices
+        self._na = scratch.num_aspects
+        self._no = len(scratch.outline(steps)) if outlines else 0
+
+        self._keys = []
+        for params in keyframes:
+            scratch.parameters = list(params)
+            flat = list(params)
+            for v in scratch.vertices:
+                flat += v
+            for T in scratch.edges:
+                flat += T
+            for M in scratch.aspects:
+                flat += M
+            flat += scratch.t1
+            flat += scratch.t2
+            if outlines:
+                for p in scratch.outline(steps):
+                    flat += p
+            self._keys.append(flat)
+
+        self._np = scratch.num_parameters
+
+    def __len__(self):
+        return self.frames
+
+    def __iter__(self):
+        for idx in range(self.frames):
+            yield self.frame(idx)
+
+    def _flat(self, idx):
+        if not 0 <= idx < self.frames:
+            raise IndexError(f"Frame {idx} is out of range for an animation of {self.frames} frames.")
+
+        if len(self._keys) == 1 or self.frames == 1:
+            return self._keys[0]
+
+        u = idx * (len(self._keys) - 1) / (self.frames - 1)
+        seg = min(math.floor(u), len(self._keys) - 2)
+        w = u - seg
+        a = self._keys[seg]
+        b = self._keys[seg + 1]
+        return [(1.0 - w) * x + w * y for x, y in zip(a, b)]
+
+    def frame_array(self, idx: int, dtype: str = 'f'):
+
+        # Frame `idx` as one flat array, e.g. for uploading to the GPU:
+        # parameters, vertices, edge transforms, aspect transforms, t1, t2
+        # and (with outlines) outline points, in AnimationFrame order.
+        _check_dtype(dtype)
+        return array(dtype, self._flat(idx))
+
+    def frame(self, idx: int):
+        flat = self._flat(idx)
+        k = 0
+
+        def take(n):
+            nonlocal k
+            ret = flat[k:k + n]
+            k += n
+            return ret
+
+        params = take(self._np)
+        verts = [Point(*take(2)) for _ in range(self._nv)]
+        edges = [take(6) for _ in range(self._nv)]
+        aspects = [take(6) for _ in range(self._na)]
+        t1 = Point(*take(2))
+        t2 = Point(*take(2))
+        outline = [Point(*take(2)) for _ in range(self._no)] if self.outlines else None
+
+        return AnimationFrame(idx, params, verts, edges, aspects, t1, t2, outline)
@@ -0,0 +1,119 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import tile_shape
+
+from array import array
+from typing import List
+
+
+class TileBatch:
+
+    # Struct-of-arrays storage for a list of tiles: int32 lattice indices,
+    # uint8 aspects and colors, and six affine coefficients per tile, flat
+    # in T (float64, or float32 when T is an array('f')).  Iterating yields
+    # the same Shapes as fill_region_bounds; masking, reordering and
+    # concatenation build new batches without going through Shapes.
+
+    FIELDS = ('t1', 't2', 'aspect', 'color')
+
+    def __init__(self, t1=None, t2=None, aspect=None, T=None, color=None):
+        self.t1 = t1 if t1 is not None else array('i')
+        self.t2 = t2 if t2 is not None else array('i')
+        self.aspect = aspect if aspect is not None else array('B')
+        self.T = T if T is not None else array('d')
+        self.color = color if color is not None else array('B')
+
+        n = len(self.aspect)
+        if not (len(self.t1) == len(self.t2) == len(self.color) == n and len(self.T) == 6 * n):
+            raise ValueError("All TileBatch arrays must describe the same number of tiles.")
+
+    def __len__(self):
+        return len(self.aspect)
+
+    @property
+    def nbytes(self):
+        return sum(arr.itemsize * len(arr) for arr in (self.t1, self.t2, self.aspect, self.T, self.color))
+
+    @property
+    def transforms(self):
+        # T as an (N, 6) view, e.g. for numpy.asarray.  Memoryviews can't
+        # have a zero-length dimension, so an empty batch gives T's view.
+        if not len(self):
+            return memoryview(self.T)
+        return memoryview(self.T).cast('B').cast(self.T.typecode, (len(self), 6))
+
+    def _shape(self, k):
+        return tile_shape(list(self.T[6 * k:6 * k + 6]), self.t1[k], self.t2[k], self.aspect[k])
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self._shape(k)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return self.take(range(*k.indices(len(self))))
+
+        n = len(self)
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError(f"Tile index {k} is out of range for a batch of {n} tiles.")
+        return self._shape(k)
+
+    def take(self, indices):
+        indices = list(indices)
+        T = array(self.T.typecode)
+        for k in indices:
+            T.extend(self.T[6 * k:6 * k + 6])
+
+        return TileBatch(
+            array('i', (self.t1[k] for k in indices)),
+            array('i', (self.t2[k] for k in indices)),
+            array('B', (self.aspect[k] for k in indices)),
+            T,
+            array('B', (self.color[k] for k in indices)),
+        )
+
+    def mask(self, flags):
+        flags = list(flags)
+        if len(flags) != len(self):
+            raise ValueError(f"The mask has {len(flags)} entries, but the batch holds {len(self)} tiles.")
+        return self.take(k for k, keep in enumerate(flags) if keep)
+
+    def sort(self, *fields: str, reverse: bool = False):
+
+        # A new batch ordered by the named columns ('t1', 't2', 'aspect',
+        # 'color', or 'x' / 'y' for the translation), compared in turn.
+        # The sort is stable, so ties keep their fill order.
+        columns = []
+        for name in fields:
+            if name in self.FIELDS:
+                columns.append(getattr(self, name))
+            elif name in ('x', 'y'):
+                columns.append(self.T[2 if name == 'x' else 5::6])
+            else:
+                raise ValueError(f"Cannot sort a TileBatch by '{name}'.")
+
+        order = sorted(range(len(self)), key=lambda k: tuple(col[k] for col in columns), reverse=reverse)
+        return self.take(order)
+
+    def astype(self, dtype: str):
+        # The same tiles with T stored as array(dtype).
+        return TileBatch(array('i', self.t1), array('i', self.t2), array('B', self.aspect),
+                         array(dtype, self.T), array('B', self.color))
+
+    @classmethod
+    def concatenate(cls, batches: List['TileBatch']):
+        # T takes the first batch's precision.
+        batches = list(batches)
+        ret = cls(T=array(batches[0].T.typecode if batches else 'd'))
+        for batch in batches:
+            ret.t1.extend(batch.t1)
+            ret.t2.extend(batch.t2)
+            ret.aspect.extend(batch.aspect)
+            ret.T.extend(batch.T if batch.T.typecode == ret.T.typecode else array(ret.T.typecode, batch.T))
+            ret.color.extend(batch.color)
+        return ret
+
+    def __add__(self, other: 'TileBatch'):
+        return TileBatch.concatenate([self, other])
@@ -0,0 +1,119 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import DEFAULT_COLORS
+from .tactile import IsohedralTiling
+from .raster import _render_rgb, _render_svg, encode_png
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import sys
+import time
+
+
+# tactile-render: batch-render a manifest of tilings to PNG or SVG files.
+#
+# The manifest is a JSON list (or one JSON object per line) of jobs:
+#
+#   {"type": 7, "parameters": [...], "edges": [[[x, y], [x, y]], [], ...],
+#    "region": [xmin, ymin, xmax, ymax], "size": [width, height],
+#    "output": "out/tiling.png", "colors": [[r, g, b], ...]}
+#
+# Only "type" is required.  The output format follows the file extension.
+
+DEFAULT_REGION = [-2.0, -2.0, 12.0, 12.0]
+DEFAULT_SIZE = [1000, 1000]
+
+
+def load_manifest(path: str):
+    with open(path) as f:
+        text = f.read()
+
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def render_job(job):
+    tiling = IsohedralTiling(job['type'])
+    if 'parameters' in job:
+        tiling.parameters = [float(v) for v in job['parameters']]
+    if 'edges' in job:
+        tiling.edge_curves = job['edges']
+
+    region = job.get('region', DEFAULT_REGION)
+    width, height = job.get('size', DEFAULT_SIZE)
+    colors = [tuple(c) for c in job.get('colors', DEFAULT_COLORS)]
+    output = job['output']
+
+    background = (0, 0, 0)
+    if output.lower().endswith('.svg'):
+        svg, tiles = _render_svg(tiling, *region, width, height, colors, background)
+        data = svg.encode('utf-8')
+    else:
+        rgb, tiles = _render_rgb(tiling, *region, width, height, colors, background)
+        data = encode_png(rgb, width, height)
+
+    # The output only appears once it is complete, so a failed job never
+    # leaves a file behind that a later run would skip.
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f'{output}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, output)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    return tiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='tactile-render', description='Render a manifest of tilings to image or SVG files.')
+    parser.add_argument('manifest', help='JSON list or JSON-lines file of render jobs')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('-o', '--output-dir', default='.', help='directory for jobs without an "output"')
+    parser.add_argument('--format', choices=['png', 'svg'], default='png', help='format for jobs without an "output"')
+    parser.add_argument('--force', action='store_true', help='re-render outputs that already exist')
+    args = parser.parse_args(argv)
+
+    jobs = []
+    skipped = 0
+    for idx, job in enumerate(load_manifest(args.manifest)):
+        job = dict(job)
+        if 'output' not in job:
+            job['output'] = os.path.join(args.output_dir, f'tiling_{idx:06d}.{args.format}')
+        if not args.force and os.path.exists(job['output']):
+            skipped += 1
+            continue
+        jobs.append(job)
+
+    start = time.perf_counter()
+    tiles = 0
+    failed = 0
+    with ProcessPoolExecutor(args.workers) as pool:
+        futures = [pool.submit(render_job, job) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                tiles += future.result()
+            except Exception as e:
+                failed += 1
+                print(f"{job['output']}: {e}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    rendered = len(jobs) - failed
+    rate = 1.0 / elapsed if elapsed > 0.0 else 0.0
+    print(f'rendered {rendered} files ({skipped} skipped, {failed} failed) in {elapsed:.2f}s: '
+          f'{rendered * rate:.2f} files/s, {tiles * rate:.0f} tiles/s')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
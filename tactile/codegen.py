@@ -0,0 +1,95 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import Point
+
+import hashlib
+import importlib.util
+import os
+
+
+# Generates, per tiling type, a straight-line Python function that evaluates
+# every vertex, aspect transform and translation vector for a parameter
+# list.  Coefficients are folded in as constants, zero terms are dropped
+# and unit terms lose their multiplication; the remaining terms are summed
+# in the same order as make_point/make_matrix so the results match them.
+#
+# Set `cache_dir` (or the TACTILE_CODEGEN_DIR environment variable) to
+# keep the generated modules on disk, where Python also caches their
+# bytecode between runs.
+
+cache_dir = os.environ.get('TACTILE_CODEGEN_DIR')
+
+
+def _affine_expr(coeffs, offs, num_params):
+    const = float(coeffs[offs + num_params])
+    expr = repr(const) if const != 0.0 else ''
+
+    for i in range(num_params):
+        c = float(coeffs[offs + i])
+        if c == 0.0:
+            continue
+        if c == 1.0:
+            sign, term = '+', f'p{i}'
+        elif c == -1.0:
+            sign, term = '-', f'p{i}'
+        else:
+            sign, term = '+', f'{c!r} * p{i}'
+
+        if expr:
+            expr += f' {sign} {term}'
+        else:
+            expr = term if sign == '+' else f'-{term}'
+
+    return expr or '0.0'
+
+
+def generate_source(ttd):
+    np = ttd.num_params
+    lines = ['def evaluate(params):']
+
+    if np:
+        lines.append('    ' + ', '.join(f'p{i}' for i in range(np)) + (',' if np == 1 else '') + ' = params')
+
+    verts = []
+    for idx in range(ttd.num_vertices):
+        offs = idx * (2 * (np + 1))
+        verts.append(f'Point({_affine_expr(ttd.vertex_coeffs, offs, np)}, '
+                     f'{_affine_expr(ttd.vertex_coeffs, offs + np + 1, np)})')
+    lines.append('    verts = [' + ', '.join(verts) + ']')
+
+    aspects = []
+    for idx in range(ttd.num_aspects):
+        offs = 6 * (np + 1) * idx
+        row = [_affine_expr(ttd.aspect_coeffs, offs + k * (np + 1), np) for k in range(6)]
+        aspects.append('[' + ', '.join(row) + ']')
+    lines.append('    aspects = [' + ', '.join(aspects) + ']')
+
+    for name, offs in (('t1', 0), ('t2', 2 * (np + 1))):
+        lines.append(f'    {name} = Point({_affine_expr(ttd.translation_coeffs, offs, np)}, '
+                     f'{_affine_expr(ttd.translation_coeffs, offs + np + 1, np)})')
+
+    lines.append('    return verts, aspects, t1, t2')
+    return '\n'.join(lines) + '\n'
+
+
+def compile_evaluator(tp, ttd):
+    source = generate_source(ttd)
+
+    if cache_dir:
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+        path = os.path.join(cache_dir, f'tactile_ih{tp:02d}_{digest}.py')
+        if not os.path.exists(path):
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'w') as f:
+                f.write('from tactile.preamble import Point\n\n\n' + source)
+            os.replace(tmp, path)
+
+        spec = importlib.util.spec_from_file_location(f'tactile_ih{tp:02d}_{digest}', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.evaluate
+
+    namespace = {'Point': Point}
+    exec(compile(source, f'<tactile IH{tp:02d}>', 'exec'), namespace)
+    return namespace['evaluate']
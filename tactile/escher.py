@@ -0,0 +1,158 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import EdgeShape, Point
+from .tiling_data import TilingTypeData, tiling_types
+from .tactile import IsohedralTiling
+from .geometry import polygon_area, resample_outline
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import math
+import random
+
+
+# Escherization (Kaplan & Salesin, 2000): find the isohedral tiling whose
+# prototile is closest to a target outline.  Every tiling type is optimized
+# independently by a simple adaptive random search over its parameters and
+# free edge control points, and unpromising types are dropped between
+# rounds (successive halving).
+
+EscherResult = namedtuple('EscherResult', ['tiling_type', 'parameters', 'edge_curves', 'distance'])
+
+
+def normalize_outline(pts, count: int = 64):
+    # Resampled, counter-clockwise, centred on the origin and scaled to unit
+    # RMS radius, as complex numbers.
+    pts = [Point(*p) for p in pts]
+    if polygon_area(pts) < 0.0:
+        pts = pts[::-1]
+
+    zs = [complex(p.x, p.y) for p in resample_outline(pts, count)]
+    c = sum(zs) / count
+    zs = [z - c for z in zs]
+    scale = math.sqrt(sum(abs(z) ** 2 for z in zs) / count)
+    if scale == 0.0:
+        return None
+    return [z / scale for z in zs]
+
+
+def _normalized_distance(a, b):
+
+    # Procrustes distance minimized over rotation and starting point.  For
+    # unit-RMS shapes the residual after the best rotation is
+    # 2 - 2 |sum(a_i * conj(b_i))| / n.
+    n = len(a)
+    bc = [z.conjugate() for z in b]
+    best = 0.0
+    for k in range(n):
+        s = sum(x * y for x, y in zip(a, bc[k:] + bc[:k]))
+        best = max(best, abs(s))
+    return max(0.0, 2.0 - 2.0 * best / n)
+
+
+def shape_distance(a, b, samples: int = 64):
+    na = normalize_outline(a, samples)
+    nb = normalize_outline(b, samples)
+    if na is None or nb is None:
+        return math.inf
+    return _normalized_distance(na, nb)
+
+
+def _initial_vector(tp):
+    ttd = TilingTypeData.get_data(tp)
+    x = list(ttd.default_params)
+    for shp in ttd.edge_shapes:
+        if shp == EdgeShape.J:
+            x += [1.0 / 3.0, 0.0, 2.0 / 3.0, 0.0]
+        elif shp == EdgeShape.S or shp == EdgeShape.U:
+            x += [1.0 / 3.0, 0.0]
+    return x
+
+
+def _decode(ttd, x):
+    params = list(x[:ttd.num_params])
+    curves = []
+    k = ttd.num_params
+    for shp in ttd.edge_shapes:
+        if shp == EdgeShape.J:
+            curves.append([Point(x[k], x[k + 1]), Point(x[k + 2], x[k + 3])])
+            k += 4
+        elif shp == EdgeShape.S:
+            curves.append([Point(x[k], x[k + 1]), Point(1.0 - x[k], -x[k + 1])])
+            k += 2
+        elif shp == EdgeShape.U:
+            curves.append([Point(x[k], x[k + 1]), Point(1.0 - x[k], x[k + 1])])
+            k += 2
+        else:
+            curves.append([])
+    return params, curves
+
+
+def _score(tiling, x, target, steps):
+    params, curves = _decode(tiling.ttd, x)
+    tiling.parameters = params
+    tiling.edge_curves = curves
+
+    outline = tiling.outline(steps)
+    if not tiling.is_simple(steps):
+        return math.inf
+
+    candidate = normalize_outline(outline, len(target))
+    if candidate is None:
+        return math.inf
+    return _normalized_distance(target, candidate)
+
+
+def _search(job):
+    tp, x, score, sigma, iterations, seed, target, steps = job
+    rng = random.Random(seed)
+    tiling = IsohedralTiling(tp)
+
+    if score is None:
+        score = _score(tiling, x, target, steps)
+
+    for _ in range(iterations):
+        y = [v + rng.gauss(0.0, sigma) for v in x]
+        s = _score(tiling, y, target, steps)
+        if s < score:
+            x, score = y, s
+            sigma = min(0.5, sigma * 1.5)
+        else:
+            sigma = max(1e-3, sigma * 0.9)
+
+    return tp, x, score, sigma
+
+
+def escherize(target, types=None, iterations: int = 200, rounds: int = 3, keep: float = 0.25,
+              samples: int = 64, steps: int = 8, seed: int = 0, processes: int = None):
+
+    target = normalize_outline(target, samples)
+    if target is None:
+        raise ValueError("The target outline has no extent.")
+
+    states = {tp: (_initial_vector(tp), None, 0.1) for tp in (tiling_types if types is None else types)}
+    survivors = list(states)
+
+    with ProcessPoolExecutor(processes) as pool:
+        for rnd in range(rounds):
+            # Later rounds spend more effort on fewer types.
+            budget = iterations * (2 ** rnd)
+            jobs = [
+                (tp, states[tp][0], states[tp][1], states[tp][2], budget, f'tactile:{seed}:{tp}:{rnd}', target, steps)
+                for tp in survivors
+            ]
+            for tp, x, score, sigma in pool.map(_search, jobs):
+                states[tp] = (x, score, sigma)
+
+            survivors.sort(key=lambda tp: states[tp][1])
+            if rnd < rounds - 1:
+                survivors = survivors[:max(1, math.ceil(len(survivors) * keep))]
+
+    ret = []
+    for tp, (x, score, _) in states.items():
+        if score is None:
+            continue
+        params, curves = _decode(TilingTypeData.get_data(tp), x)
+        ret.append(EscherResult(tp, params, curves, score))
+    ret.sort(key=lambda r: r.distance)
+    return ret
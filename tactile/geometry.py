@@ -0,0 +1,505 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import Point, mul
+
+from collections import namedtuple
+import math
+
+
+def bezier_point(p0, p1, p2, p3, t):
+    s = 1.0 - t
+    a = s * s * s
+    b = 3.0 * s * s * t
+    c = 3.0 * s * t * t
+    d = t * t * t
+    return Point(
+        a * p0.x + b * p1.x + c * p2.x + d * p3.x,
+        a * p0.y + b * p1.y + c * p2.y + d * p3.y,
+    )
+
+
+def edge_segments(tiling, curves=None):
+
+    # Walk the boundary of the prototile the same way the examples do,
+    # producing one list of control points per edge: either a straight
+    # segment [P, Q] or a cubic Bezier [P, C1, C2, Q].
+    if curves is None:
+        curves = tiling.edge_curves
+
+    for si in tiling.shapes:
+        S = si.T
+        ej = curves[si.id]
+
+        seg = [mul(S, Point(0.0, 0.0))]
+        if ej:
+            seg.append(mul(S, ej[0]))
+            seg.append(mul(S, ej[1]))
+        seg.append(mul(S, Point(1.0, 0.0)))
+
+        if si.rev:
+            seg.reverse()
+
+        yield seg
+
+
+def flatten_segments(segments, steps=8):
+    pts = []
+    for seg in segments:
+        if len(seg) == 2:
+            pts.append(seg[0])
+        else:
+            for i in range(steps):
+                pts.append(bezier_point(seg[0], seg[1], seg[2], seg[3], i / steps))
+    return pts
+
+
+def polygon_area(pts):
+    n = len(pts)
+    area = 0.0
+    for i in range(n):
+        p = pts[i - 1]
+        q = pts[i]
+        area += p.x * q.y - q.x * p.y
+    return 0.5 * area
+
+
+def resample_outline(pts, count: int):
+    # `count` points spaced evenly by arc length around a closed polygon.
+    n = len(pts)
+    lengths = [math.hypot(pts[(i + 1) % n].x - pts[i].x, pts[(i + 1) % n].y - pts[i].y) for i in range(n)]
+    total = sum(lengths)
+
+    ret = []
+    i = 0
+    walked = 0.0
+    for k in range(count):
+        target = total * k / count
+        while i < n - 1 and walked + lengths[i] < target:
+            walked += lengths[i]
+            i += 1
+        t = (target - walked) / lengths[i] if lengths[i] > 0.0 else 0.0
+        p = pts[i]
+        q = pts[(i + 1) % n]
+        ret.append(Point(p.x + t * (q.x - p.x), p.y + t * (q.y - p.y)))
+    return ret
+
+
+def transform_points(M, pts):
+    return [mul(M, p) for p in pts]
+
+
+def _cross(o, a, b):
+    return (a.x - o.x) * (b.y - o.y) - (a.y - o.y) * (b.x - o.x)
+
+
+def _in_triangle(p, a, b, c):
+    # Inclusive test on a counter-clockwise triangle.
+    return _cross(a, b, p) >= 0.0 and _cross(b, c, p) >= 0.0 and _cross(c, a, p) >= 0.0
+
+
+def triangulate(pts, eps=1e-12):
+
+    # Ear clipping.  Returns index triples into `pts`, always wound
+    # counter-clockwise regardless of the input orientation.
+    n = len(pts)
+    if n < 3:
+        return []
+
+    idx = list(range(n))
+    if polygon_area(pts) < 0.0:
+        idx.reverse()
+
+    tris = []
+    while len(idx) > 3:
+        m = len(idx)
+        clipped = False
+
+        for k in range(m):
+            ia, ib, ic = idx[k - 1], idx[k], idx[(k + 1) % m]
+            a, b, c = pts[ia], pts[ib], pts[ic]
+
+            if _cross(a, b, c) <= eps:
+                continue
+
+            ear = True
+            for j in idx:
+                if j == ia or j == ib or j == ic:
+                    continue
+                p = pts[j]
+                if p == a or p == b or p == c:
+                    continue
+                if _in_triangle(p, a, b, c):
+                    ear = False
+                    break
+
+            if ear:
+                tris.append((ia, ib, ic))
+                del idx[k]
+                clipped = True
+                break
+
+        if not clipped:
+            # Only degenerate (collinear or touching) corners remain.
+            # Drop a flat vertex if there is one, otherwise force a clip
+            # so that we always make progress.
+            for k in range(m):
+                if abs(_cross(pts[idx[k - 1]], pts[idx[k]], pts[idx[(k + 1) % m]])) <= eps:
+                    del idx[k]
+                    break
+            else:
+                tris.append((idx[-1], idx[0], idx[1]))
+                del idx[0]
+
+    if abs(_cross(pts[idx[0]], pts[idx[1]], pts[idx[2]])) > eps:
+        tris.append((idx[0], idx[1], idx[2]))
+
+    return tris
+
+
+def _on_segment(p, q, r):
+    # r is known to be collinear with p and q.
+    return min(p.x, q.x) <= r.x <= max(p.x, q.x) and min(p.y, q.y) <= r.y <= max(p.y, q.y)
+
+
+def segments_intersect(p1, p2, q1, q2):
+    d1 = _cross(q1, q2, p1)
+    d2 = _cross(q1, q2, p2)
+    d3 = _cross(p1, p2, q1)
+    d4 = _cross(p1, p2, q2)
+
+    if ((d1 > 0.0 and d2 < 0.0) or (d1 < 0.0 and d2 > 0.0)) and \
+            ((d3 > 0.0 and d4 < 0.0) or (d3 < 0.0 and d4 > 0.0)):
+        return True
+
+    return (d1 == 0.0 and _on_segment(q1, q2, p1)) or \
+        (d2 == 0.0 and _on_segment(q1, q2, p2)) or \
+        (d3 == 0.0 and _on_segment(p1, p2, q1)) or \
+        (d4 == 0.0 and _on_segment(p1, p2, q2))
+
+
+def polygon_is_simple(pts):
+
+    # Bucket the edges into a uniform grid and only test pairs that share a
+    # cell, which keeps the flattened outlines we deal with close to linear.
+    n = len(pts)
+    if n < 3:
+        return False
+
+    for i in range(n):
+        # Consecutive edges share a vertex; they only conflict if the
+        # boundary doubles back on itself.
+        a, b, c = pts[i - 2], pts[i - 1], pts[i]
+        if _cross(a, b, c) == 0.0 and (b.x - a.x) * (c.x - b.x) + (b.y - a.y) * (c.y - b.y) <= 0.0:
+            return False
+
+    xmin = min(p.x for p in pts)
+    xmax = max(p.x for p in pts)
+    ymin = min(p.y for p in pts)
+    ymax = max(p.y for p in pts)
+
+    res = max(1, int(math.sqrt(n)))
+    sx = res / ((xmax - xmin) or 1.0)
+    sy = res / ((ymax - ymin) or 1.0)
+
+    grid = {}
+    for i in range(n):
+        p = pts[i]
+        q = pts[(i + 1) % n]
+        cx0 = min(int((min(p.x, q.x) - xmin) * sx), res - 1)
+        cx1 = min(int((max(p.x, q.x) - xmin) * sx), res - 1)
+        cy0 = min(int((min(p.y, q.y) - ymin) * sy), res - 1)
+        cy1 = min(int((max(p.y, q.y) - ymin) * sy), res - 1)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                grid.setdefault((cx, cy), []).append(i)
+
+    for bucket in grid.values():
+        m = len(bucket)
+        for j in range(m):
+            i = bucket[j]
+            p1 = pts[i]
+            p2 = pts[(i + 1) % n]
+            ex0, ex1 = (p1.x, p2.x) if p1.x < p2.x else (p2.x, p1.x)
+            ey0, ey1 = (p1.y, p2.y) if p1.y < p2.y else (p2.y, p1.y)
+            for k in range(j + 1, m):
+                h = bucket[k]
+                if h == i + 1 or (h + 1) % n == i or (i + 1) % n == h:
+                    continue
+                q1 = pts[h]
+                q2 = pts[(h + 1) % n]
+                # Most pairs sharing a cell don't even overlap in x or y.
+                if (q1.x < ex0 and q2.x < ex0) or (q1.x > ex1 and q2.x > ex1) or \
+                        (q1.y < ey0 and q2.y < ey0) or (q1.y > ey1 and q2.y > ey1):
+                    continue
+                if segments_intersect(p1, p2, q1, q2):
+                    return False
+
+    return True
+
+
+def point_in_polygon(p, pts):
+    inside = False
+    n = len(pts)
+    for i in range(n):
+        a = pts[i - 1]
+        b = pts[i]
+        if (a.y <= p.y) != (b.y <= p.y):
+            x = a.x + (p.y - a.y) * (b.x - a.x) / (b.y - a.y)
+            if p.x < x:
+                inside = not inside
+    return inside
+
+
+def bounds(pts):
+    return (
+        min(p.x for p in pts),
+        min(p.y for p in pts),
+        max(p.x for p in pts),
+        max(p.y for p in pts),
+    )
+
+
+def mask_predicate(mask, width: int, height: int, xmin: float, ymin: float, xmax: float, ymax: float):
+
+    # A visibility predicate for fill_region_hierarchical from a row-major
+    # width x height grid of truthy cells covering [xmin, xmax] x [ymin,
+    # ymax].  A summed-area table answers "is any cell in this box set" in
+    # O(1).  Boxes are widened to whole cells, so the test is conservative.
+    sat = [0] * ((width + 1) * (height + 1))
+    for j in range(height):
+        run = 0
+        for i in range(width):
+            run += 1 if mask[j * width + i] else 0
+            sat[(j + 1) * (width + 1) + i + 1] = sat[j * (width + 1) + i + 1] + run
+
+    sx = width / (xmax - xmin)
+    sy = height / (ymax - ymin)
+
+    def visible(x0, y0, x1, y1):
+        i0 = max(0, math.floor((x0 - xmin) * sx))
+        j0 = max(0, math.floor((y0 - ymin) * sy))
+        i1 = min(width, math.floor((x1 - xmin) * sx) + 1)
+        j1 = min(height, math.floor((y1 - ymin) * sy) + 1)
+        if i0 >= i1 or j0 >= j1:
+            return False
+        w = width + 1
+        return sat[j1 * w + i1] - sat[j0 * w + i1] - sat[j1 * w + i0] + sat[j0 * w + i0] > 0
+
+    return visible
+
+
+def is_convex(pts):
+    # True for convex polygons with positive area, in either orientation.
+    if len(pts) < 3 or polygon_area(pts) == 0.0:
+        return False
+
+    # Every turn must go the same way, and the turns must add up to one
+    # full revolution; a pentagram turns consistently but twice.
+    sign = 0.0
+    turning = 0.0
+    n = len(pts)
+    for i in range(n):
+        a, b, c = pts[i - 2], pts[i - 1], pts[i]
+        cr = _cross(a, b, c)
+        if cr != 0.0:
+            if sign * cr < 0.0:
+                return False
+            sign = cr
+        turning += math.atan2(cr, (b.x - a.x) * (c.x - b.x) + (b.y - a.y) * (c.y - b.y))
+    return abs(abs(turning) - 2.0 * math.pi) < 1e-6
+
+
+def clip_polygon(pts, clip):
+
+    # Sutherland-Hodgman: the part of polygon `pts` inside the convex
+    # polygon `clip` (either orientation).  Returns [] when nothing is
+    # left.  A concave `pts` may come back with zero-width bridges along
+    # the clip boundary, which fill and stroke the same as the exact cut.
+    if polygon_area(clip) < 0.0:
+        clip = clip[::-1]
+
+    out = list(pts)
+    for i in range(len(clip)):
+        a = clip[i - 1]
+        b = clip[i]
+        src = out
+        out = []
+        if not src:
+            break
+
+        prev = src[-1]
+        prev_in = _cross(a, b, prev) >= 0.0
+        for cur in src:
+            cur_in = _cross(a, b, cur) >= 0.0
+            if cur_in != prev_in:
+                dp = _cross(a, b, prev)
+                t = dp / (dp - _cross(a, b, cur))
+                out.append(Point(prev.x + t * (cur.x - prev.x), prev.y + t * (cur.y - prev.y)))
+            if cur_in:
+                out.append(cur)
+            prev = cur
+            prev_in = cur_in
+
+    return out if len(out) >= 3 else []
+
+
+def polygons_intersect(a, b):
+    ax0, ay0, ax1, ay1 = bounds(a)
+    bx0, by0, bx1, by1 = bounds(b)
+    if ax1 < bx0 or bx1 < ax0 or ay1 < by0 or by1 < ay0:
+        return False
+
+    if point_in_polygon(a[0], b) or point_in_polygon(b[0], a):
+        return True
+
+    for i in range(len(a)):
+        p1 = a[i - 1]
+        p2 = a[i]
+        for j in range(len(b)):
+            if segments_intersect(p1, p2, b[j - 1], b[j]):
+                return True
+    return False
+
+
+def strip_spans(pts, ylo, yhi):
+
+    # The x-intervals covered by the part of a polygon (convex or not) that
+    # lies in the horizontal strip ylo <= y <= yhi.  Every such point either
+    # sits above a boundary piece inside the strip or on a vertical line
+    # that is inside the polygon across the whole strip, so the union of
+    # the clipped edges' x-ranges and the spans along y = ylo covers it.
+    spans = []
+    n = len(pts)
+
+    crossings = []
+    for i in range(n):
+        p = pts[i - 1]
+        q = pts[i]
+
+        if (p.y <= ylo) != (q.y <= ylo):
+            crossings.append(p.x + (ylo - p.y) * (q.x - p.x) / (q.y - p.y))
+
+        if max(p.y, q.y) < ylo or min(p.y, q.y) > yhi:
+            continue
+        if p.y == q.y:
+            spans.append((min(p.x, q.x), max(p.x, q.x)))
+            continue
+
+        t0 = (ylo - p.y) / (q.y - p.y)
+        t1 = (yhi - p.y) / (q.y - p.y)
+        if t0 > t1:
+            t0, t1 = t1, t0
+        t0 = max(t0, 0.0)
+        t1 = min(t1, 1.0)
+        x0 = p.x + t0 * (q.x - p.x)
+        x1 = p.x + t1 * (q.x - p.x)
+        spans.append((min(x0, x1), max(x0, x1)))
+
+    crossings.sort()
+    for i in range(0, len(crossings) - 1, 2):
+        spans.append((crossings[i], crossings[i + 1]))
+
+    spans.sort()
+    merged = []
+    for lo, hi in spans:
+        if merged and lo <= merged[-1][1]:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _gauss_legendre(n):
+    # Nodes and weights for n-point Gauss-Legendre quadrature on [0, 1].
+    rule = []
+    for i in range(1, n + 1):
+        x = math.cos(math.pi * (i - 0.25) / (n + 0.5))
+        for _ in range(100):
+            p0, p1 = 1.0, x
+            for k in range(2, n + 1):
+                p0, p1 = p1, ((2 * k - 1) * x * p1 - (k - 1) * p0) / k
+            dp = n * (x * p1 - p0) / (x * x - 1.0)
+            dx = p1 / dp
+            x -= dx
+            if abs(dx) < 1e-16:
+                break
+        rule.append((0.5 * (1.0 - x), 1.0 / ((1.0 - x * x) * dp * dp)))
+    return rule
+
+
+# The moment integrands of a cubic are polynomials of degree at most 8, so
+# five nodes integrate them exactly.  Arc length has no closed form and gets
+# a denser rule instead.
+_MOMENT_RULE = _gauss_legendre(5)
+_LENGTH_RULE = _gauss_legendre(16)
+
+
+def _cubic_derivative(p0, p1, p2, p3, t):
+    s = 1.0 - t
+    a = 3.0 * s * s
+    b = 6.0 * s * t
+    c = 3.0 * t * t
+    return Point(
+        a * (p1.x - p0.x) + b * (p2.x - p1.x) + c * (p3.x - p2.x),
+        a * (p1.y - p0.y) + b * (p2.y - p1.y) + c * (p3.y - p2.y),
+    )
+
+
+def segment_moments(seg):
+
+    # Green's theorem contributions of one boundary piece:
+    # (signed area, integral of x dA, integral of y dA, length), from the
+    # integrands (x dy - y dx) / 2, x^2 / 2 dy and -y^2 / 2 dx.  Straight
+    # and curved pieces must use the same integrands, since only their sum
+    # around a closed boundary is independent of that choice.
+    if len(seg) == 2:
+        p, q = seg
+        return (
+            0.5 * (p.x * q.y - q.x * p.y),
+            (p.x * p.x + p.x * q.x + q.x * q.x) * (q.y - p.y) / 6.0,
+            -(p.y * p.y + p.y * q.y + q.y * q.y) * (q.x - p.x) / 6.0,
+            math.hypot(q.x - p.x, q.y - p.y),
+        )
+
+    area = 0.0
+    mx = 0.0
+    my = 0.0
+    for t, w in _MOMENT_RULE:
+        p = bezier_point(*seg, t)
+        d = _cubic_derivative(*seg, t)
+        area += w * 0.5 * (p.x * d.y - p.y * d.x)
+        mx += w * 0.5 * p.x * p.x * d.y
+        my -= w * 0.5 * p.y * p.y * d.x
+
+    length = 0.0
+    for t, w in _LENGTH_RULE:
+        d = _cubic_derivative(*seg, t)
+        length += w * math.hypot(d.x, d.y)
+
+    return area, mx, my, length
+
+
+Metrics = namedtuple('Metrics', ['area', 'perimeter', 'centroid', 'isoperimetric_quotient'])
+
+
+def shape_metrics(segments):
+    area = 0.0
+    mx = 0.0
+    my = 0.0
+    perimeter = 0.0
+    for seg in segments:
+        a, x, y, length = segment_moments(seg)
+        area += a
+        mx += x
+        my += y
+        perimeter += length
+
+    if area == 0.0:
+        centroid = Point(math.nan, math.nan)
+    else:
+        centroid = Point(mx / area, my / area)
+
+    iq = 4.0 * math.pi * abs(area) / (perimeter * perimeter) if perimeter > 0.0 else 0.0
+
+    return Metrics(abs(area), perimeter, centroid, iq)
@@ -0,0 +1,197 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .geometry import polygon_area, transform_points, triangulate
+from .tactile import _check_dtype
+
+from array import array
+from collections import namedtuple
+import json
+import math
+import os
+import shutil
+import struct
+import tempfile
+
+
+# Flat buffers: `vertices` holds `dim` floats per vertex and `faces` holds
+# three vertex indices per triangle.
+Mesh = namedtuple('Mesh', ['vertices', 'faces', 'dim'])
+
+
+class TileMesh:
+
+    # Triangulates the prototile once per aspect and instances the result
+    # for every tile produced by one of the fill functions.
+
+    def __init__(self, tiling, steps: int = 8):
+        outline = tiling.outline(steps)
+
+        self._templates = []
+        for A in tiling.aspects:
+            pts = transform_points(A, outline)
+            # Reflected aspects flip the winding; keep every template
+            # counter-clockwise so that face normals agree.
+            if polygon_area(pts) < 0.0:
+                pts.reverse()
+            self._templates.append((pts, triangulate(pts), A[2], A[5]))
+
+        self._extruded = {}
+
+    def _extruded_faces(self, asp):
+        faces = self._extruded.get(asp)
+        if faces is None:
+            pts, tris, _, _ = self._templates[asp]
+            n = len(pts)
+            faces = [(a + n, b + n, c + n) for a, b, c in tris]
+            faces += [(c, b, a) for a, b, c in tris]
+            for i in range(n):
+                j = (i + 1) % n
+                faces.append((i, j, j + n))
+                faces.append((i, j + n, i + n))
+            self._extruded[asp] = faces
+        return faces
+
+    def tile_geometry(self, tile, height: float = None):
+        pts, tris, ax, ay = self._templates[tile.aspect]
+        dx = tile.T[2] - ax
+        dy = tile.T[5] - ay
+
+        if height is None:
+            return [(p.x + dx, p.y + dy) for p in pts], tris
+
+        verts = [(p.x + dx, p.y + dy, 0.0) for p in pts]
+        verts += [(p.x + dx, p.y + dy, height) for p in pts]
+        return verts, self._extruded_faces(tile.aspect)
+
+    def build(self, tiles, height: float = None, dtype: str = 'd', origin=None):
+        # With dtype='f' the vertices are float32; pass an `origin` near the
+        # tiles to keep x and y relative to it and preserve their precision.
+        _check_dtype(dtype)
+        dim = 2 if height is None else 3
+        vertices = array(dtype)
+        faces = array('I')
+
+        base = 0
+        for tile in tiles:
+            verts, tris = self.tile_geometry(tile, height)
+            if origin is not None:
+                verts = [(v[0] - origin[0], v[1] - origin[1]) + tuple(v[2:]) for v in verts]
+            for v in verts:
+                vertices.extend(v)
+            for a, b, c in tris:
+                faces.extend((a + base, b + base, c + base))
+            base += len(verts)
+
+        return Mesh(vertices, faces, dim)
+
+
+def _lift(v):
+    return v if len(v) == 3 else (v[0], v[1], 0.0)
+
+
+def _normal(a, b, c):
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    nx = uy * vz - uz * vy
+    ny = uz * vx - ux * vz
+    nz = ux * vy - uy * vx
+    length = math.sqrt(nx * nx + ny * ny + nz * nz)
+    if length == 0.0:
+        return 0.0, 0.0, 0.0
+    return nx / length, ny / length, nz / length
+
+
+# The writers below consume `tiles` lazily, so arbitrarily large regions
+# can be exported without holding the whole mesh in memory.
+
+def write_obj(path, tile_mesh: TileMesh, tiles, height: float = None):
+    with open(path, 'w') as f:
+        base = 1
+        for tile in tiles:
+            verts, tris = tile_mesh.tile_geometry(tile, height)
+            for v in verts:
+                f.write('v %r %r %r\n' % _lift(v))
+            for a, b, c in tris:
+                f.write('f %d %d %d\n' % (a + base, b + base, c + base))
+            base += len(verts)
+
+
+def write_stl(path, tile_mesh: TileMesh, tiles, height: float = None):
+    pack = struct.Struct('<12fH').pack
+
+    with open(path, 'wb') as f:
+        f.write(b'tactile'.ljust(80, b'\0'))
+        f.write(struct.pack('<I', 0))
+
+        count = 0
+        for tile in tiles:
+            verts, tris = tile_mesh.tile_geometry(tile, height)
+            verts = [_lift(v) for v in verts]
+            for ia, ib, ic in tris:
+                a, b, c = verts[ia], verts[ib], verts[ic]
+                f.write(pack(*_normal(a, b, c), *a, *b, *c, 0))
+            count += len(tris)
+
+        # The triangle count lives in the header, so patch it in afterwards.
+        f.seek(80)
+        f.write(struct.pack('<I', count))
+
+
+def write_gltf(path, tile_mesh: TileMesh, tiles, height: float = None):
+    bin_path = os.path.splitext(path)[0] + '.bin'
+    pack_vertex = struct.Struct('<3f').pack
+    pack_face = struct.Struct('<3I').pack
+
+    lo = [math.inf] * 3
+    hi = [-math.inf] * 3
+    num_verts = 0
+    num_faces = 0
+
+    # Positions and indices live in separate buffer views of one file.  The
+    # indices are spooled to a temporary file and appended at the end.
+    with open(bin_path, 'wb') as f, tempfile.TemporaryFile() as idx:
+        for tile in tiles:
+            verts, tris = tile_mesh.tile_geometry(tile, height)
+            for v in verts:
+                v = _lift(v)
+                for k in range(3):
+                    lo[k] = min(lo[k], v[k])
+                    hi[k] = max(hi[k], v[k])
+                f.write(pack_vertex(*v))
+            for a, b, c in tris:
+                idx.write(pack_face(a + num_verts, b + num_verts, c + num_verts))
+            num_verts += len(verts)
+            num_faces += len(tris)
+
+        idx.seek(0)
+        shutil.copyfileobj(idx, f)
+
+    pos_length = 12 * num_verts
+    idx_length = 12 * num_faces
+
+    doc = {
+        "asset": {"version": "2.0", "generator": "tactile"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0}],
+        "meshes": [{"primitives": [{"attributes": {"POSITION": 0}, "indices": 1, "mode": 4}]}],
+        "buffers": [{"uri": os.path.basename(bin_path), "byteLength": pos_length + idx_length}],
+        "bufferViews": [
+            {"buffer": 0, "byteOffset": 0, "byteLength": pos_length, "target": 34962},
+            {"buffer": 0, "byteOffset": pos_length, "byteLength": idx_length, "target": 34963},
+        ],
+        "accessors": [
+            {
+                "bufferView": 0,
+                "componentType": 5126,
+                "count": num_verts,
+                "type": "VEC3",
+                "min": lo if num_verts else [0.0] * 3,
+                "max": hi if num_verts else [0.0] * 3,
+            },
+            {"bufferView": 1, "componentType": 5125, "count": 3 * num_faces, "type": "SCALAR"},
+        ],
+    }
+
+    with open(path, 'w') as f:
+        json.dump(doc, f)
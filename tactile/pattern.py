@@ -0,0 +1,172 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import DEFAULT_COLORS, Point, cell_transform, mul
+from .geometry import bounds, transform_points
+
+from collections import namedtuple
+import json
+import math
+import zlib
+
+
+# Exporters that describe a whole tiling by one translational unit plus
+# its lattice vectors, so output size doesn't depend on the region drawn.
+# When the coloring isn't invariant under t1 or t2 the unit is the smallest
+# block of p1 x p2 lattice cells that repeats with its colors.
+
+UnitTile = namedtuple('UnitTile', ['t1', 't2', 'aspect', 'color', 'T', 'outline'])
+PatternUnit = namedtuple('PatternUnit', ['t1', 't2', 'period', 'tiles'])
+
+
+def color_period(tiling):
+    nc = tiling.ttd.coloring[18]
+    na = tiling.num_aspects
+
+    def periodic(p, along_t1):
+        for a in range(nc):
+            for b in range(nc):
+                for asp in range(na):
+                    shifted = tiling.get_color(a + p, b, asp) if along_t1 else tiling.get_color(a, b + p, asp)
+                    if shifted != tiling.get_color(a, b, asp):
+                        return False
+        return True
+
+    def smallest(along_t1):
+        for p in range(1, nc + 1):
+            if nc % p == 0 and periodic(p, along_t1):
+                return p
+        return nc
+
+    return smallest(True), smallest(False)
+
+
+def translational_unit(tiling, steps: int = 8):
+    p1, p2 = color_period(tiling)
+    t1 = tiling.t1
+    t2 = tiling.t2
+    outline = tiling.outline(steps)
+
+    tiles = []
+    for a in range(p1):
+        for b in range(p2):
+            for asp, A in enumerate(tiling.aspects):
+                T = cell_transform(A, t1, t2, a, b)
+                tiles.append(UnitTile(a, b, asp, tiling.get_color(a, b, asp), T, transform_points(T, outline)))
+
+    return PatternUnit(
+        Point(p1 * t1.x, p1 * t1.y),
+        Point(p2 * t2.x, p2 * t2.y),
+        (p1, p2),
+        tiles,
+    )
+
+
+def _unit_cell_pieces(unit):
+
+    # Every tile of the unit in pattern space, where the unit cell is
+    # [0, 1] x [0, 1], repeated so that the parts hanging over the cell's
+    # edges wrap around onto the opposite sides.
+    P1 = unit.t1
+    P2 = unit.t2
+    det = 1.0 / (P1.x * P2.y - P2.x * P1.y)
+    M = [P2.y * det, -P2.x * det, 0.0, -P1.y * det, P1.x * det, 0.0]
+
+    pieces = []
+    for tile in unit.tiles:
+        pts = [mul(M, p) for p in tile.outline]
+        x0, y0, x1, y1 = bounds(pts)
+        for i in range(math.floor(-x1) + 1, math.ceil(1.0 - x0)):
+            for j in range(math.floor(-y1) + 1, math.ceil(1.0 - y0)):
+                pieces.append((tile.color, [Point(p.x + i, p.y + j) for p in pts]))
+    return pieces
+
+
+def _palette(colors, index):
+    return colors[index % len(colors)]
+
+
+def svg_pattern(tiling, colors=DEFAULT_COLORS, width: float = 1000.0, height: float = 1000.0,
+                scale: float = 100.0, steps: int = 8, pattern_id: str = 'tiling'):
+    unit = translational_unit(tiling, steps)
+    P1 = unit.t1
+    P2 = unit.t2
+
+    paths = []
+    for color, pts in _unit_cell_pieces(unit):
+        d = 'M' + ' L'.join(f'{p.x:.6g},{p.y:.6g}' for p in pts) + ' Z'
+        r, g, b = _palette(colors, color)
+        paths.append(f'<path d="{d}" fill="rgb({r},{g},{b})"/>')
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" height="{height:g}">'
+        f'<defs><pattern id="{pattern_id}" patternUnits="userSpaceOnUse" width="1" height="1" '
+        f'patternTransform="matrix({scale * P1.x:.9g} {scale * P1.y:.9g} {scale * P2.x:.9g} {scale * P2.y:.9g} 0 0)">'
+        + ''.join(paths) +
+        f'</pattern></defs><rect width="{width:g}" height="{height:g}" fill="url(#{pattern_id})"/></svg>'
+    )
+
+
+def pdf_pattern(tiling, colors=DEFAULT_COLORS, width: float = 612.0, height: float = 792.0,
+                scale: float = 72.0, steps: int = 8):
+    unit = translational_unit(tiling, steps)
+    P1 = unit.t1
+    P2 = unit.t2
+
+    ops = []
+    for color, pts in _unit_cell_pieces(unit):
+        r, g, b = _palette(colors, color)
+        ops.append(f'{r / 255:.4g} {g / 255:.4g} {b / 255:.4g} rg')
+        ops.append(f'{pts[0].x:.6g} {pts[0].y:.6g} m')
+        ops.extend(f'{p.x:.6g} {p.y:.6g} l' for p in pts[1:])
+        ops.append('h f')
+    cell = zlib.compress('\n'.join(ops).encode('ascii'))
+    page = f'/Pattern cs /P0 scn 0 0 {width:g} {height:g} re f'.encode('ascii')
+
+    matrix = ' '.join(f'{v:.9g}' for v in (scale * P1.x, scale * P1.y, scale * P2.x, scale * P2.y, 0.0, 0.0))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:g} {height:g}] '
+        f'/Resources << /Pattern << /P0 5 0 R >> >> /Contents 4 0 R >>'.encode('ascii'),
+        b'<< /Length %d >>\nstream\n' % len(page) + page + b'\nendstream',
+        f'<< /PatternType 1 /PaintType 1 /TilingType 1 /BBox [0 0 1 1] /XStep 1 /YStep 1 '
+        f'/Resources << >> /Matrix [{matrix}] /Filter /FlateDecode /Length {len(cell)} >>\nstream\n'.encode('ascii')
+        + cell + b'\nendstream',
+    ]
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % num + body + b'\nendobj\n'
+
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for off in offsets:
+        out += b'%010d 00000 n \n' % off
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def json_pattern(tiling, steps: int = 8):
+    unit = translational_unit(tiling, steps)
+    return json.dumps({
+        "tiling_type": tiling.tiling_type,
+        "parameters": list(tiling.parameters),
+        "edge_curves": [[list(p) for p in ej] for ej in tiling.edge_curves],
+        "t1": list(tiling.t1),
+        "t2": list(tiling.t2),
+        "period": list(unit.period),
+        "lattice": [list(unit.t1), list(unit.t2)],
+        "tiles": [
+            {
+                "t1": tile.t1,
+                "t2": tile.t2,
+                "aspect": tile.aspect,
+                "color": tile.color,
+                "T": tile.T,
+                "outline": [list(p) for p in tile.outline],
+            }
+            for tile in unit.tiles
+        ],
+    })
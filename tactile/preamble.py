@@ -11,6 +11,12 @@ class EdgeShape(Enum):
     S = 10003
     I = 10004
 
+class DetailLevel(Enum):
+
+    CURVES = 1
+    POLYGON = 2
+    BLOCKS = 3
+
 Point = namedtuple('Point', ['x', 'y'])
 
 Shape = namedtuple('Shape', [
@@ -33,6 +39,14 @@ Shape = namedtuple('Shape', [
     None,
     ])
 
+# Struct-of-arrays counterpart of Shape for bulk fills: per-tile lattice
+# indices and aspect, and six affine coefficients per tile in T.
+TileBlock = namedtuple('TileBlock', ['t1', 't2', 'aspect', 'T'])
+
+# RGB colors used by the exporters and renderers when none are given,
+# indexed by IsohedralTiling.get_color.
+DEFAULT_COLORS = [(230, 57, 70), (241, 250, 238), (69, 123, 157), (29, 53, 87)]
+
 
 def mul(A, B):
     if hasattr(B, 'x'):
@@ -57,6 +71,35 @@ def mul(A, B):
             ]
 
 
+def rect_quad(xmin, ymin, xmax, ymax):
+    # Corners of an axis-aligned rectangle, counterclockwise from (xmin, ymin).
+    return (Point(xmin, ymin), Point(xmax, ymin), Point(xmax, ymax), Point(xmin, ymax))
+
+
+def cell_transform(M, t1, t2, xi, yi):
+    # Aspect transform M moved to lattice cell (xi, yi).
+    T = list(M)
+    T[2] += xi * t1.x + yi * t2.x
+    T[5] += xi * t1.y + yi * t2.y
+    return T
+
+
+def tile_shape(T, xi, yi, asp):
+    # The Shape the fill functions emit for one tile.
+    return Shape(
+        **{
+            "T": T,
+            "id": False,
+            "shape": False,
+            "rev": False,
+            "second": False,
+            "t1": xi,
+            "t2": yi,
+            "aspect": asp,
+        }
+    )
+
+
 def matchSeg(p, q):
     return [
         q.x - p.x,
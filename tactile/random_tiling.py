@@ -0,0 +1,93 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import EdgeShape, Point
+from .tiling_data import TilingTypeData, tiling_types
+from .tactile import IsohedralTiling
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import random
+
+
+RandomTiling = namedtuple('RandomTiling', ['tiling_type', 'parameters', 'edge_curves'])
+
+
+def random_edge_curve(rng: random.Random, shp: EdgeShape):
+
+    # Bezier control points with the symmetries each edge shape requires.
+    # See https://github.com/isohedral/tactile-js/ for more info.
+    if shp == EdgeShape.J:
+        # Anything works for J
+        return [
+            Point(rng.random() * 0.6, rng.random() - 0.5),
+            Point(rng.random() * 0.6 + 0.4, rng.random() - 0.5),
+        ]
+    elif shp == EdgeShape.S:
+        # 180-degree rotational symmetry
+        p = Point(rng.random() * 0.6, rng.random() - 0.5)
+        return [p, Point(1.0 - p.x, -p.y)]
+    elif shp == EdgeShape.U:
+        # Symmetry after reflecting/flipping across length.
+        p = Point(rng.random() * 0.6, rng.random() - 0.5)
+        return [p, Point(1.0 - p.x, p.y)]
+
+    # Must be a straight line.
+    return []
+
+
+class RandomTilingGenerator:
+
+    def __init__(self, seed: int = None, shard: int = 0, types=None, perturbation: float = 0.2):
+        # Every (seed, shard) pair gets its own stream, so shards can be
+        # generated independently and in any order.
+        if seed is None:
+            self.rng = random.Random()
+        else:
+            self.rng = random.Random(f'tactile:{seed}:{shard}')
+        self.types = list(tiling_types if types is None else types)
+        self.perturbation = perturbation
+
+    def sample(self):
+        rng = self.rng
+        tp = rng.choice(self.types)
+        ttd = TilingTypeData.get_data(tp)
+
+        params = [p + (rng.random() - 0.5) * self.perturbation for p in ttd.default_params]
+        curves = [random_edge_curve(rng, shp) for shp in ttd.edge_shapes]
+
+        return RandomTiling(tp, params, curves)
+
+    def generate(self, count: int):
+        return [self.sample() for _ in range(count)]
+
+
+def make_tiling(sample: RandomTiling):
+    tiling = IsohedralTiling(sample.tiling_type)
+    tiling.parameters = list(sample.parameters)
+    tiling.edge_curves = sample.edge_curves
+    return tiling
+
+
+def _generate_shard(args):
+    seed, shard, count, types, perturbation = args
+    return RandomTilingGenerator(seed, shard, types, perturbation).generate(count)
+
+
+def generate_random_tilings(count: int, seed: int, processes: int = None, shard_size: int = 10000,
+                            types=None, perturbation: float = 0.2):
+
+    # The output is split into fixed-size shards rather than one chunk per
+    # worker, so the result for a given seed doesn't depend on `processes`.
+    jobs = []
+    for shard, start in enumerate(range(0, count, shard_size)):
+        jobs.append((seed, shard, min(shard_size, count - start), types, perturbation))
+
+    ret = []
+    if processes == 1 or len(jobs) <= 1:
+        for job in jobs:
+            ret.extend(_generate_shard(job))
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            for samples in pool.map(_generate_shard, jobs):
+                ret.extend(samples)
+    return ret
@@ -0,0 +1,144 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import DEFAULT_COLORS, DetailLevel, mul, rect_quad
+from .geometry import edge_segments
+
+import math
+import struct
+import zlib
+
+
+# Small dependency-free renderers: scanline polygon filling into an RGB
+# bytearray with a PNG encoder, and an SVG writer that keeps the Bezier
+# edges exact.
+
+
+def fill_polygon(rgb: bytearray, width: int, height: int, pts, color):
+
+    # Even-odd fill, sampling at pixel centres.
+    pixel = bytes(color)
+    ys = [p.y for p in pts]
+    row0 = max(0, math.ceil(min(ys) - 0.5))
+    row1 = min(height - 1, math.floor(max(ys) - 0.5))
+    n = len(pts)
+
+    for row in range(row0, row1 + 1):
+        y = row + 0.5
+        xs = []
+        for i in range(n):
+            a = pts[i - 1]
+            b = pts[i]
+            if (a.y <= y) != (b.y <= y):
+                xs.append(a.x + (y - a.y) * (b.x - a.x) / (b.y - a.y))
+        xs.sort()
+
+        base = row * width
+        for k in range(0, len(xs) - 1, 2):
+            c0 = max(0, math.ceil(xs[k] - 0.5))
+            c1 = min(width, math.ceil(xs[k + 1] - 0.5))
+            if c1 > c0:
+                rgb[3 * (base + c0):3 * (base + c1)] = pixel * (c1 - c0)
+
+
+def render_rgb(tiling, xmin: float, ymin: float, xmax: float, ymax: float, width: int, height: int,
+               colors=DEFAULT_COLORS, background=(0, 0, 0)):
+    return _render_rgb(tiling, xmin, ymin, xmax, ymax, width, height, colors, background)[0]
+
+
+def _render_rgb(tiling, xmin, ymin, xmax, ymax, width, height, colors, background):
+
+    # World rectangle -> width x height RGB pixels, with y pointing down,
+    # and the number of tiles (or blocks) drawn.
+    rgb = bytearray(bytes(background) * (width * height))
+
+    sx = width / (xmax - xmin)
+    sy = height / (ymax - ymin)
+    ST = [sx, 0.0, -xmin * sx, 0.0, sy, -ymin * sy]
+    ppu = min(sx, sy)
+
+    outline = tiling.outline(pixels_per_unit=ppu)
+    blocks = tiling.detail_level(ppu) == DetailLevel.BLOCKS
+    if blocks:
+        # Blocks are emitted per lattice cell; pad by one cell so that the
+        # parallelograms reach the corners.
+        pad = math.hypot(*tiling.t1) + math.hypot(*tiling.t2)
+        tiles = tiling.fill_region_bounds(xmin - pad, ymin - pad, xmax + pad, ymax + pad, pixels_per_unit=ppu)
+    else:
+        tiles = tiling.fill_region_polygon(rect_quad(xmin, ymin, xmax, ymax))
+
+    count = 0
+    for tile in tiles:
+        count += 1
+        T = mul(ST, tile.T)
+        pts = [mul(T, p) for p in outline]
+        if blocks:
+            # A block stands in for all of its cell's tiles, so give it their
+            # average color.
+            cell = [colors[tiling.get_color(tile.t1, tile.t2, asp) % len(colors)] for asp in range(tiling.num_aspects)]
+            color = [sum(c[k] for c in cell) // len(cell) for k in range(3)]
+        else:
+            color = colors[tiling.get_color(tile.t1, tile.t2, tile.aspect) % len(colors)]
+        fill_polygon(rgb, width, height, pts, color)
+
+    return rgb, count
+
+
+def _png_chunk(kind: bytes, data: bytes):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+
+def encode_png(rgb, width: int, height: int):
+    stride = 3 * width
+    raw = bytearray()
+    for row in range(height):
+        raw.append(0)
+        raw += rgb[row * stride:(row + 1) * stride]
+
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + _png_chunk(b'IDAT', zlib.compress(bytes(raw), 6))
+        + _png_chunk(b'IEND', b'')
+    )
+
+
+def render_png(tiling, xmin: float, ymin: float, xmax: float, ymax: float, width: int, height: int,
+               colors=DEFAULT_COLORS, background=(0, 0, 0)):
+    rgb = render_rgb(tiling, xmin, ymin, xmax, ymax, width, height, colors, background)
+    return encode_png(rgb, width, height)
+
+
+def render_svg(tiling, xmin: float, ymin: float, xmax: float, ymax: float, width: int, height: int,
+               colors=DEFAULT_COLORS, background=(0, 0, 0)):
+    return _render_svg(tiling, xmin, ymin, xmax, ymax, width, height, colors, background)[0]
+
+
+def _render_svg(tiling, xmin, ymin, xmax, ymax, width, height, colors, background):
+
+    # The SVG document and the number of tiles in it.
+    sx = width / (xmax - xmin)
+    sy = height / (ymax - ymin)
+    ST = [sx, 0.0, -xmin * sx, 0.0, sy, -ymin * sy]
+
+    segments = list(edge_segments(tiling))
+
+    r, g, b = background
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">',
+        f'<rect width="{width}" height="{height}" fill="rgb({r},{g},{b})"/>',
+    ]
+    for tile in tiling.fill_region_polygon(rect_quad(xmin, ymin, xmax, ymax)):
+        T = mul(ST, tile.T)
+        start = mul(T, segments[0][0])
+        d = [f'M{start.x:.2f},{start.y:.2f}']
+        for seg in segments:
+            pts = [mul(T, p) for p in seg[1:]]
+            if len(pts) == 1:
+                d.append(f'L{pts[0].x:.2f},{pts[0].y:.2f}')
+            else:
+                d.append('C' + ' '.join(f'{p.x:.2f},{p.y:.2f}' for p in pts))
+        r, g, b = colors[tiling.get_color(tile.t1, tile.t2, tile.aspect) % len(colors)]
+        out.append(f'<path d="{"".join(d)}Z" fill="rgb({r},{g},{b})"/>')
+    out.append('</svg>')
+    return '\n'.join(out), len(out) - 3
@@ -0,0 +1,242 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import DEFAULT_COLORS
+from .tactile import IsohedralTiling, _restore_tiling
+from .tiling_data import tiling_types
+from .raster import render_png
+
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import asyncio
+import json
+import time
+
+
+# A local slippy-map (XYZ) tile server.  Tile z/x/y covers a square of
+# world_size / 2**z units, with tile 0/0/0 spanning [0, world_size]^2.
+# GET /{z}/{x}/{y}.png renders the server's tiling; the query parameters
+# `type` and `params` (comma separated) select another one.  GET /metrics
+# reports cache and latency statistics as JSON.
+
+
+def tile_bounds(z: int, x: int, y: int, world_size: float):
+    size = world_size / (1 << z)
+    return x * size, y * size, (x + 1) * size, (y + 1) * size
+
+
+def _render_job(job):
+    tp, params, curves, z, x, y, tile_size, world_size, colors = job
+    tiling = _restore_tiling(tp, list(params), curves)
+    return render_png(tiling, *tile_bounds(z, x, y, world_size), tile_size, tile_size, colors)
+
+
+class TileServer:
+
+    def __init__(self, tiling, host: str = '127.0.0.1', port: int = 8000, tile_size: int = 256,
+                 world_size: float = 16.0, colors=DEFAULT_COLORS, cache_size: int = 1024,
+                 processes: int = None):
+        self.host = host
+        self.port = port
+        self.tile_size = tile_size
+        self.world_size = world_size
+        self.colors = [tuple(c) for c in colors]
+        self.cache_size = cache_size
+
+        self._state = self._tiling_state(tiling)
+        self._pool = ProcessPoolExecutor(processes)
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._server = None
+
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=1000)
+
+    @staticmethod
+    def _tiling_state(tiling):
+        return (
+            tiling.tiling_type,
+            tuple(tiling.parameters),
+            tuple(tuple((p.x, p.y) for p in ej) for ej in tiling.edge_curves),
+        )
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._pool.shutdown()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def metrics(self):
+        # Requests that joined an in-flight render didn't start one, so
+        # they count towards the hit rate along with cache hits.
+        lat = sorted(self._latencies)
+        lookups = self.hits + self.coalesced + self.misses
+
+        def pct(q):
+            return lat[min(len(lat) - 1, int(q * len(lat)))] if lat else 0.0
+
+        return {
+            "requests": self.requests,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "cached_tiles": len(self._cache),
+            "latency_ms": {
+                "mean": 1000.0 * sum(lat) / len(lat) if lat else 0.0,
+                "p50": 1000.0 * pct(0.5),
+                "p95": 1000.0 * pct(0.95),
+            },
+        }
+
+    async def tile(self, state, z: int, x: int, y: int):
+        key = (state, z, x, y)
+
+        png = self._cache.get(key)
+        if png is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return png
+
+        # Identical requests that arrive while a tile renders share it.
+        future = self._pending.get(key)
+        if future is None:
+            self.misses += 1
+            loop = asyncio.get_running_loop()
+            job = (*state, z, x, y, self.tile_size, self.world_size, self.colors)
+            future = loop.run_in_executor(self._pool, _render_job, job)
+            self._pending[key] = future
+            try:
+                png = await future
+            finally:
+                del self._pending[key]
+
+            self._cache[key] = png
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return png
+
+        self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _state_for(self, query):
+        if 'type' not in query:
+            return self._state
+
+        tp = int(query['type'][0])
+        if tp not in tiling_types:
+            raise ValueError(f"Unknown tiling type {tp}.")
+        tiling = IsohedralTiling(tp)
+        if 'params' in query:
+            tiling.parameters = [float(v) for v in query['params'][0].split(',') if v]
+        return self._tiling_state(tiling)
+
+    async def _handle(self, reader, writer):
+        start = time.perf_counter()
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+
+            parts = request.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                await self._respond(writer, 405, 'text/plain', b'Method Not Allowed')
+                return
+
+            url = urlsplit(parts[1])
+            if url.path == '/metrics':
+                body = json.dumps(self.metrics()).encode('utf-8')
+                await self._respond(writer, 200, 'application/json', body)
+                return
+
+            self.requests += 1
+            try:
+                z, x, name = url.path.strip('/').split('/')
+                z = int(z)
+                x = int(x)
+                y = int(name[:-len('.png')]) if name.endswith('.png') else int(name)
+                if z < 0 or not (0 <= x < 1 << z and 0 <= y < 1 << z):
+                    raise ValueError(f"Tile {z}/{x}/{y} does not exist.")
+                state = self._state_for(parse_qs(url.query))
+            except (ValueError, TypeError, IndexError) as e:
+                await self._respond(writer, 400, 'text/plain', str(e).encode('utf-8'))
+                return
+
+            try:
+                png = await self.tile(state, z, x, y)
+            except Exception as e:
+                self.errors += 1
+                await self._respond(writer, 500, 'text/plain', f'Rendering failed: {e}'.encode('utf-8'))
+                return
+            await self._respond(writer, 200, 'image/png', png)
+            self._latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status: int, content_type: str, body: bytes):
+        reason = {200: 'OK', 400: 'Bad Request', 405: 'Method Not Allowed', 500: 'Internal Server Error'}[status]
+        writer.write(
+            f'HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + body
+        )
+        await writer.drain()
+
+
+async def fetch(host: str, port: int, path: str):
+
+    # Minimal loopback HTTP client: returns (status, headers, body).
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode('latin-1'))
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+    writer.close()
+    await writer.wait_closed()
+    return status, headers, body
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve an isohedral tiling as XYZ map tiles.')
+    parser.add_argument('--type', type=int, default=1, help='tiling type, e.g. 1 for IH1')
+    parser.add_argument('--params', type=str, default=None, help='comma separated tiling parameters')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    tiling = IsohedralTiling(args.type)
+    if args.params:
+        tiling.parameters = [float(v) for v in args.params.split(',')]
+
+    server = TileServer(tiling, args.host, args.port, processes=args.processes)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .geometry import resample_outline
+
+from array import array
+import heapq
+import json
+import math
+import mmap
+import os
+import random
+
+
+def shape_embedding(tiling, dim: int = 16, samples: int = 64, steps: int = 8):
+
+    # Fourier magnitudes of the centroid-distance signature.  Taking
+    # magnitudes discards the starting point and rotation, and dividing by
+    # the mean radius discards scale, so plain Euclidean distance between
+    # embeddings is meaningful.
+    pts = resample_outline(tiling.outline(steps), samples)
+    cx = sum(p.x for p in pts) / samples
+    cy = sum(p.y for p in pts) / samples
+    r = [math.hypot(p.x - cx, p.y - cy) for p in pts]
+    mean = sum(r) / samples
+
+    ret = array('f')
+    for m in range(1, dim + 1):
+        re = 0.0
+        im = 0.0
+        for k, v in enumerate(r):
+            ang = 2.0 * math.pi * m * k / samples
+            re += v * math.cos(ang)
+            im -= v * math.sin(ang)
+        ret.append(math.hypot(re, im) / (samples * mean) if mean > 0.0 else 0.0)
+    return ret
+
+
+class ShapeIndex:
+
+    # An append-only on-disk store of (tiling type, embedding) records with
+    # a vantage-point tree over them.  Records are memory-mapped for
+    # queries.  Records added since the last build() are scanned linearly
+    # until the next build.
+
+    def __init__(self, path: str, dim: int = 16):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.dim = meta['dim']
+            self._tree_count = meta['tree_count']
+        else:
+            self.dim = dim
+            self._tree_count = 0
+            self._write_meta()
+            for name in ('vectors.f32', 'types.i32'):
+                open(os.path.join(path, name), 'wb').close()
+
+        self._maps = {}
+        self._tree = None
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _write_meta(self):
+        with open(self._file('meta.json'), 'w') as f:
+            json.dump({'dim': self.dim, 'tree_count': self._tree_count}, f)
+
+    def _view(self, name, typecode):
+        size = os.path.getsize(self._file(name))
+        if size == 0:
+            return memoryview(array(typecode))
+
+        cached = self._maps.get(name)
+        if cached is not None and cached[0] == size:
+            return cached[2]
+
+        with open(self._file(name), 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm).cast(typecode)
+        self._maps[name] = (size, mm, view)
+        return view
+
+    def __len__(self):
+        return os.path.getsize(self._file('types.i32')) // 4
+
+    def add(self, tilings, steps: int = 8):
+        start = len(self)
+        vectors = array('f')
+        types = array('i')
+        for tiling in tilings:
+            vectors.extend(shape_embedding(tiling, self.dim, steps=steps))
+            types.append(tiling.tiling_type)
+
+        with open(self._file('vectors.f32'), 'ab') as f:
+            vectors.tofile(f)
+        with open(self._file('types.i32'), 'ab') as f:
+            types.tofile(f)
+
+        return range(start, start + len(types))
+
+    def _vector(self, vectors, i):
+        return vectors[i * self.dim:(i + 1) * self.dim]
+
+    def build(self, seed: int = 0):
+        vectors = self._view('vectors.f32', 'f')
+        count = len(self)
+        rng = random.Random(seed)
+
+        node_idx = array('i')
+        node_mu = array('d')
+        node_left = array('i')
+        node_right = array('i')
+
+        def make(items):
+            if not items:
+                return -1
+
+            k = rng.randrange(len(items))
+            items[0], items[k] = items[k], items[0]
+            vp = items[0]
+            v = self._vector(vectors, vp)
+
+            node = len(node_idx)
+            node_idx.append(vp)
+            node_mu.append(0.0)
+            node_left.append(-1)
+            node_right.append(-1)
+
+            rest = items[1:]
+            if rest:
+                dists = sorted((math.dist(v, self._vector(vectors, i)), i) for i in rest)
+                mid = len(dists) // 2
+                node_mu[node] = dists[mid][0]
+                node_left[node] = make([i for _, i in dists[:mid]])
+                node_right[node] = make([i for _, i in dists[mid:]])
+            return node
+
+        make(list(range(count)))
+
+        for name, arr in (('tree_idx.i32', node_idx), ('tree_mu.f64', node_mu),
+                          ('tree_left.i32', node_left), ('tree_right.i32', node_right)):
+            with open(self._file(name), 'wb') as f:
+                arr.tofile(f)
+
+        self._tree_count = count
+        self._tree = None
+        self._write_meta()
+
+    def _load_tree(self):
+        if self._tree is None:
+            if self._tree_count == 0:
+                self._tree = ([], [], [], [])
+            else:
+                self._tree = (
+                    self._view('tree_idx.i32', 'i'),
+                    self._view('tree_mu.f64', 'd'),
+                    self._view('tree_left.i32', 'i'),
+                    self._view('tree_right.i32', 'i'),
+                )
+        return self._tree
+
+    def query(self, target, k: int = 10, tiling_type: int = None, max_visits: int = None):
+
+        # `target` is a tiling or an embedding.  Records of every type are
+        # searched unless `tiling_type` is given.  With `max_visits` the
+        # tree search stops early and the result is approximate.
+        if hasattr(target, 'outline'):
+            target = shape_embedding(target, self.dim)
+
+        vectors = self._view('vectors.f32', 'f')
+        types = self._view('types.i32', 'i')
+        idx, mu, left, right = self._load_tree()
+
+        heap = []  # max-heap of (-distance, record)
+
+        def consider(i):
+            if tiling_type is not None and types[i] != tiling_type:
+                return None
+            d = math.dist(target, self._vector(vectors, i))
+            if len(heap) < k:
+                heapq.heappush(heap, (-d, i))
+            elif d < -heap[0][0]:
+                heapq.heapreplace(heap, (-d, i))
+            return d
+
+        visits = 0
+        stack = [(0, 0.0)] if len(idx) else []
+        while stack:
+            node, bound = stack.pop()
+            if len(heap) == k and bound > -heap[0][0]:
+                continue
+            if max_visits is not None and visits >= max_visits:
+                break
+            visits += 1
+
+            i = idx[node]
+            d = consider(i)
+            if d is None:
+                d = math.dist(target, self._vector(vectors, i))
+
+            # Visit the side the target falls in first; the other side can
+            # only hold closer records if the target is near the boundary.
+            if d < mu[node]:
+                near, far = left[node], right[node]
+            else:
+                near, far = right[node], left[node]
+            if far != -1:
+                stack.append((far, abs(d - mu[node])))
+            if near != -1:
+                stack.append((near, 0.0))
+
+        for i in range(self._tree_count, len(self)):
+            consider(i)
+
+        return [(i, -nd) for nd, i in sorted(heap, reverse=True)]
@@ -1,9 +1,19 @@
-from .preamble import EdgeShape, mul, matchSeg, Shape, Point
+from .preamble import EdgeShape, DetailLevel, mul, matchSeg, Shape, TileBlock, Point
+from .preamble import cell_transform, rect_quad, tile_shape
 from .tiling_data import TilingTypeData, Tiling, tiling_types
+from .geometry import edge_segments, flatten_segments, shape_metrics, polygon_is_simple
+from .geometry import bounds, polygons_intersect, strip_spans, transform_points
+from .geometry import clip_polygon, is_convex, point_in_polygon
+from .batch import TileBatch
 
 import math
 import copy
-from typing import List
+from array import array
+import threading
+from bisect import bisect_right
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
 
 
 def make_point(coeffs, offs, params):
@@ -61,29 +71,60 @@ TSPI_U = [[0.5, 0.0, 0.0, 0.0, 0.5, 0.0], [-0.5, 0.0, 1.0, 0.0, 0.5, 0.0]]
 
 TSPI_S = [[0.5, 0.0, 0.0, 0.0, 0.5, 0.0], [-0.5, 0.0, 1.0, 0.0, -0.5, 0.0]]
 
+# On-screen tile sizes, in pixels, below which the level of detail drops to
+# straight-edged polygons and then to one colored block per lattice cell.
+LOD_POLYGON_PIXELS = 32.0
+LOD_BLOCK_PIXELS = 4.0
+
+# array typecodes accepted by the `dtype` options of the bulk fills:
+# float64 and float32.  Far from the origin float32 translations lose
+# precision, so pass an `origin` near the region to store them relative
+# to it.
+FLOAT_DTYPES = ('d', 'f')
+
+# Bytes held per tile by a TileBlock, by dtype: two int32 indices, a uint8
+# aspect and six transform coefficients.
+TILE_BLOCK_BYTES = {dtype: 4 + 4 + 1 + 6 * array(dtype).itemsize for dtype in FLOAT_DTYPES}
+
+# Values per tile written by fill_region_into: t1, t2, aspect, then the
+# six transform coefficients.
+TILE_RECORD_VALUES = 9
+
+UNIT_SQUARE = [Point(0.0, 0.0), Point(1.0, 0.0), Point(1.0, 1.0), Point(0.0, 1.0)]
+
 
 class IsohedralTiling:
 
     def __init__(self, tp: Tiling):
         self.reset(tp)
 
+    @classmethod
+    def cached(cls, tp: Tiling, params: List[float] = None):
+        return tiling_cache.get(tp, params)
+
     def reset(self, tp: Tiling):
         self._tiling_type = tp
         self.ttd = TilingTypeData.get_data(tp)
         self._parameters = copy.deepcopy(self.ttd.default_params)
+        self._edge_curves = [[] for _ in range(self.ttd.num_edge_shapes)]
         self._recompute()
 
+    def __reduce__(self):
+        # Everything else is derived from these, so only ship them and let
+        # the receiving side recompute.
+        curves = [[(p.x, p.y) for p in ej] for ej in self._edge_curves]
+        return (_restore_tiling, (self._tiling_type, list(self._parameters), curves))
+
     def _recompute(self):
+        self._metrics = None
+
         ntv = self.num_vertices
-        np = self.num_parameters
-        na = self.num_aspects
 
-        # Recompute tiling vertex locations.
-        self.verts = []
-        for idx in range(ntv):
-            self.verts.append(
-                make_point(self.ttd.vertex_coeffs, idx * (2 * (np + 1)), self._parameters)
-            )
+        # Tiling vertex locations, aspect xforms and translation vectors all
+        # come from code specialized for this tiling type (see codegen.py);
+        # it computes the same sums as make_point/make_matrix.
+        evaluate = TilingTypeData.get_evaluator(self._tiling_type)
+        self.verts, self._aspects, self._t1, self._t2 = evaluate(self._parameters)
 
         # Recompute edge transforms and reversals from orientation information.
         self.reversals = []
@@ -99,17 +140,6 @@ class IsohedralTiling:
                 )
             )
 
-        # Recompute aspect xforms.
-        self._aspects = []
-        for idx in range(na):
-            self._aspects.append(
-                make_matrix(self.ttd.aspect_coeffs, 6 * (np + 1) * idx, self._parameters)
-            )
-
-        # Recompute translation vectors.
-        self._t1 = make_point(self.ttd.translation_coeffs, 0, self._parameters)
-        self._t2 = make_point(self.ttd.translation_coeffs, 2 * (np + 1), self._parameters)
-
     @property
     def tiling_type(self):
         return self._tiling_type
@@ -145,6 +175,123 @@ class IsohedralTiling:
     def edge_shapes(self):
         return self.ttd.edge_shapes
 
+    @property
+    def edge_curves(self):
+        # Cubic Bezier control points for each edge shape, in the canonical
+        # frame where the edge runs from (0,0) to (1,0).  An empty list is a
+        # straight edge.  The caller is responsible for giving each curve the
+        # symmetries its EdgeShape requires.
+        return self._edge_curves
+
+    @edge_curves.setter
+    def edge_curves(self, curves: List[List[Point]]):
+
+        expected_length = self.num_edge_shapes
+        passed_length = len(curves)
+        if passed_length != expected_length:
+            raise ValueError(f"The number of passed edge curves was {passed_length}, but {expected_length} was expected.")
+
+        for ej in curves:
+            if len(ej) not in (0, 2):
+                raise ValueError(f"Each edge curve must have 0 or 2 control points, but {len(ej)} were passed.")
+
+        self._edge_curves = [[Point(*p) for p in ej] for ej in curves]
+        self._metrics = None
+
+    @property
+    def metrics(self):
+        # Area, perimeter, centroid and isoperimetric quotient of the
+        # prototile, integrated directly from the edge control points.
+        if self._metrics is None:
+            self._metrics = shape_metrics(edge_segments(self))
+        return self._metrics
+
+    def metrics_batch(self, params_batch):
+        # Metrics for each row of a (B, num_params) batch of parameter
+        # vectors, keeping this tiling's type and edge curves.
+        scratch = _restore_tiling(self._tiling_type, list(self._parameters), self._edge_curves)
+        ret = []
+        for params in params_batch:
+            scratch.parameters = list(params)
+            ret.append(scratch.metrics)
+        return ret
+
+    def outline(self, steps: int = 8, pixels_per_unit: float = None, dtype: str = None):
+        # The prototile boundary as a closed polygon (without a repeated
+        # end point), with each curved edge flattened into `steps` pieces.
+        # With a `dtype` the points come back as one flat x, y array.
+        #
+        # Given a view scale, the outline matches what the fill functions
+        # emit at that scale: adaptively flattened curves, the bare tiling
+        # vertices, or the unit square that block transforms map onto a
+        # lattice cell.
+        if pixels_per_unit is not None:
+            level = self.detail_level(pixels_per_unit)
+            if level == DetailLevel.BLOCKS:
+                pts = list(UNIT_SQUARE)
+            elif level == DetailLevel.POLYGON:
+                pts = list(self.verts)
+            else:
+                steps = min(32, max(2, int(self._tile_pixels(pixels_per_unit) / 16.0)))
+                pts = flatten_segments(edge_segments(self), steps)
+        else:
+            pts = flatten_segments(edge_segments(self), steps)
+
+        if dtype is None:
+            return pts
+        _check_dtype(dtype)
+        return array(dtype, (v for p in pts for v in p))
+
+    def _tile_pixels(self, pixels_per_unit: float):
+        t1 = self._t1
+        t2 = self._t2
+        cell_area = abs(t1.x * t2.y - t1.y * t2.x)
+        return math.sqrt(cell_area / self.num_aspects) * pixels_per_unit
+
+    def detail_level(self, pixels_per_unit: float):
+        size = self._tile_pixels(pixels_per_unit)
+        if size < LOD_BLOCK_PIXELS:
+            return DetailLevel.BLOCKS
+        if size < LOD_POLYGON_PIXELS:
+            return DetailLevel.POLYGON
+        return DetailLevel.CURVES
+
+    def is_simple(self, steps: int = 8):
+        # False if the flattened prototile boundary crosses or touches itself.
+        return polygon_is_simple(self.outline(steps))
+
+    def is_simple_batch(self, params_batch, curves_batch=None, steps: int = 8):
+
+        # is_simple for many candidates.  Entries are parameter lists for
+        # this tiling's type, or anything with tiling_type, parameters and
+        # edge_curves (RandomTiling samples, other tilings), so one batch
+        # may mix types.  Entries of `curves_batch` override edge curves.
+        scratches = {}
+
+        def scratch_for(tp, params, curves):
+            scratch = scratches.get(tp)
+            if scratch is None:
+                scratch = scratches[tp] = _restore_tiling(tp, list(params), curves)
+            else:
+                scratch.parameters = list(params)
+                scratch.edge_curves = curves
+            return scratch
+
+        ret = []
+        for k, entry in enumerate(params_batch):
+            if hasattr(entry, 'tiling_type'):
+                tp = entry.tiling_type
+                params = entry.parameters
+                curves = entry.edge_curves
+            else:
+                tp = self._tiling_type
+                params = entry
+                curves = self._edge_curves
+            if curves_batch is not None:
+                curves = curves_batch[k]
+            ret.append(polygon_is_simple(scratch_for(tp, params, curves).outline(steps)))
+        return ret
+
     @property
     def shapes(self):
         for idx in range(self.num_vertices):
@@ -224,21 +371,225 @@ class IsohedralTiling:
     def t2(self):
         return self._t2
 
-    def fill_region_bounds(self, xmin: float, ymin: float, xmax: float, ymax: float):
-        yield from self._fill_region_quad(
-            Point(xmin, ymin),
-            Point(xmax, ymin),
-            Point(xmax, ymax),
-            Point(xmin, ymax)
+    def fill_region_bounds(self, xmin: float, ymin: float, xmax: float, ymax: float,
+                           pixels_per_unit: float = None):
+        quad = rect_quad(xmin, ymin, xmax, ymax)
+
+        if pixels_per_unit is not None and self.detail_level(pixels_per_unit) == DetailLevel.BLOCKS:
+            yield from self._fill_blocks(*quad)
+        else:
+            yield from self._fill_region_quad(*quad)
+
+    def fill_region_chunks(self, xmin: float, ymin: float, xmax: float, ymax: float,
+                           max_bytes: int = 1 << 20, dtype: str = 'd', origin: Point = None):
+
+        # The same tiles as fill_region_bounds, in the same order, delivered
+        # as TileBlocks that each stay within `max_bytes`.
+        _check_dtype(dtype)
+        size = max(1, max_bytes // TILE_BLOCK_BYTES[dtype])
+        yield from self._fill_chunks(
+            rect_quad(xmin, ymin, xmax, ymax),
+            size,
+            dtype,
+            origin,
         )
 
+    def _fill_chunks(self, quad, size: int, dtype: str = 'd', origin: Point = None):
+
+        def new_block():
+            return TileBlock(array('i'), array('i'), array('B'), array(dtype))
+
+        block = new_block()
+        for xi, yi, asp, T in self._tile_records(quad, origin):
+            block.t1.append(xi)
+            block.t2.append(yi)
+            block.aspect.append(asp)
+            block.T.extend(T)
+
+            if len(block.aspect) == size:
+                yield block
+                block = new_block()
+
+        if len(block.aspect):
+            yield block
+
+    def _tile_records(self, quad, origin: Point = None, start: int = 0):
+
+        # The bulk fills' per-tile records, (t1, t2, aspect, T) in
+        # fill_region_bounds order from the `start`-th tile on.  The
+        # translation in T is relative to `origin` when one is given; it is
+        # formed in double precision first, so storing it as float32
+        # afterwards keeps tiles far from the world origin accurate.
+        t1 = self._t1
+        t2 = self._t2
+        aspects = self._aspects
+        na = self.num_aspects
+        x0, y0 = origin if origin is not None else (0.0, 0.0)
+
+        skip = start
+        for yi, xlo, xhi in self._fill_rows(*quad):
+            row_tiles = max(0, xhi - xlo + 1) * na
+            if skip >= row_tiles:
+                skip -= row_tiles
+                continue
+
+            xfirst = xlo + skip // na
+            afirst = skip % na
+            skip = 0
+
+            for xi in range(xfirst, xhi + 1):
+                ox = xi * t1.x + yi * t2.x
+                oy = xi * t1.y + yi * t2.y
+                for asp in range(afirst, na):
+                    M = aspects[asp]
+                    yield xi, yi, asp, (M[0], M[1], M[2] + ox - x0, M[3], M[4], M[5] + oy - y0)
+                afirst = 0
+
+    def fill_region_batch(self, xmin: float, ymin: float, xmax: float, ymax: float,
+                          dtype: str = 'd', origin: Point = None):
+
+        # fill_region_bounds' tiles, in order, as one TileBatch with each
+        # tile's color filled in.
+        _check_dtype(dtype)
+        na = self.num_aspects
+        nc = self.ttd.coloring[18]
+        colors = [[[self.get_color(a, b, asp) for asp in range(na)] for b in range(nc)] for a in range(nc)]
+
+        batch = TileBatch(T=array(dtype))
+        for xi, yi, asp, T in self._tile_records(rect_quad(xmin, ymin, xmax, ymax), origin):
+            batch.t1.append(xi)
+            batch.t2.append(yi)
+            batch.aspect.append(asp)
+            batch.T.extend(T)
+            batch.color.append(colors[xi % nc][yi % nc][asp])
+
+        return batch
+
+    def region(self, xmin: float, ymin: float, xmax: float, ymax: float):
+        quad = rect_quad(xmin, ymin, xmax, ymax)
+        return TileRegion(self, quad)
+
+    def parallel_fill(self, xmin: float, ymin: float, xmax: float, ymax: float,
+                      workers: int = 4, chunks: int = None):
+
+        # fill_region_bounds' tiles, in order, with the region's tile
+        # sequence split into equal slices that are generated on a thread
+        # pool.
+        region = self.region(xmin, ymin, xmax, ymax)
+        n = len(region)
+        chunks = chunks or workers
+        cuts = [n * k // chunks for k in range(chunks + 1)]
+
+        with ThreadPoolExecutor(workers) as pool:
+            parts = pool.map(
+                lambda k: list(region.slice(cuts[k], cuts[k + 1])),
+                range(chunks),
+            )
+            return [tile for part in parts for tile in part]
+
+    def count_region(self, xmin: float, ymin: float, xmax: float, ymax: float):
+        # The number of tiles fill_region_bounds would yield, from the
+        # scanline rows alone.
+        quad = rect_quad(xmin, ymin, xmax, ymax)
+        cells = 0
+        for _, xlo, xhi in self._fill_rows(*quad):
+            cells += max(0, xhi - xlo + 1)
+        return cells * self.num_aspects
+
+    def fill_region_into(self, buffer, xmin: float, ymin: float, xmax: float, ymax: float,
+                         start: int = 0, dtype: str = None, origin: Point = None):
+
+        # Write fill_region_bounds' tiles, from the `start`-th on, into any
+        # writable buffer (array.array('d'), a NumPy float64 array, a
+        # bytearray, shared_memory.buf, ...) as TILE_RECORD_VALUES values
+        # per tile.  Float32 buffers are written as float32; raw byte
+        # buffers hold doubles unless `dtype` says otherwise, and other
+        # typed buffers are rejected.  Returns the number of tiles written
+        # and the `start` to pass next time, or None once the region is
+        # exhausted.
+        view = memoryview(buffer)
+        if view.readonly:
+            raise ValueError("The passed buffer must be writable.")
+        if dtype is None:
+            dtype = view.format if view.format in FLOAT_DTYPES else 'd'
+        _check_dtype(dtype)
+        # Only untyped bytes are reinterpreted; typed buffers must match.
+        if view.format != dtype and view.format not in ('B', 'b', 'c'):
+            raise ValueError(f"The passed buffer holds '{view.format}' values, but '{dtype}' records were requested.")
+        if view.format != dtype or view.ndim != 1:
+            if not view.c_contiguous:
+                raise ValueError("The passed buffer must be contiguous.")
+            itemsize = array(dtype).itemsize
+            if view.nbytes % itemsize:
+                raise ValueError(f"The passed buffer holds {view.nbytes} bytes, which is not a whole "
+                                 f"number of {itemsize}-byte '{dtype}' values.")
+            view = view.cast('B').cast(dtype)
+
+        # An empty result must mean the region is done, or callers looping
+        # on the returned `start` would never finish.
+        capacity = len(view) // TILE_RECORD_VALUES
+        if capacity == 0:
+            raise ValueError(f"The passed buffer has room for {len(view)} values, but one tile takes "
+                             f"{TILE_RECORD_VALUES}.")
+
+        count = 0
+        for xi, yi, asp, T in self._tile_records(rect_quad(xmin, ymin, xmax, ymax), origin, start):
+            if count == capacity:
+                return count, start + count
+
+            k = count * TILE_RECORD_VALUES
+            view[k:k + TILE_RECORD_VALUES] = array(dtype, (xi, yi, asp) + T)
+            count += 1
+
+        return count, None
+
+    def _fill_blocks(self, A: Point, B: Point, C: Point, D: Point):
+
+        # One shape per lattice cell, colored like its first aspect.  T maps
+        # the unit square onto a parallelogram spanned by t1 and t2, centred
+        # on the cell's tiles.
+        t1 = self._t1
+        t2 = self._t2
+        cx = 0.0
+        cy = 0.0
+        for M in self._aspects:
+            c = mul(M, Point(
+                sum(v.x for v in self.verts) / self.num_vertices,
+                sum(v.y for v in self.verts) / self.num_vertices,
+            ))
+            cx += c.x / self.num_aspects
+            cy += c.y / self.num_aspects
+        ox = cx - 0.5 * (t1.x + t2.x)
+        oy = cy - 0.5 * (t1.y + t2.y)
+
+        for yi, xlo, xhi in self._fill_rows(A, B, C, D):
+            for xi in range(xlo, xhi + 1):
+                yield tile_shape([
+                    t1.x, t2.x, ox + xi * t1.x + yi * t2.x,
+                    t1.y, t2.y, oy + xi * t1.y + yi * t2.y,
+                ], xi, yi, 0)
+
     def _fill_region_quad(self, A: Point, B: Point, C: Point, D: Point):
         t1 = self.t1
         t2 = self.t2
         ttd = self.ttd
         aspects = self._aspects
 
-        self._last_y = None
+        for yi, xlo, xhi in self._fill_rows(A, B, C, D):
+            for xi in range(xlo, xhi + 1):
+                for asp in range(ttd.num_aspects):
+                    yield tile_shape(cell_transform(aspects[asp], t1, t2, xi, yi), xi, yi, asp)
+
+    def _fill_rows(self, A: Point, B: Point, C: Point, D: Point):
+
+        # The lattice scanline behind every quad fill.  Yields one
+        # (t2, first t1, last t1) triple per row in fill order; a row may be
+        # empty, in which case last < first.  All scan progress is local to
+        # the call, so any number of fills can run on one tiling at once.
+        t1 = self.t1
+        t2 = self.t2
+
+        last_y = None
 
         def bc(M, p):
             return Point(M[0] * p.x + M[1] * p.y, M[2] * p.x + M[3] * p.y)
@@ -248,11 +599,22 @@ class IsohedralTiling:
             return Point((1.0 - t) * P.x + t * Q.x, y)
 
         def do_fill(A, B, C, D, do_top):
+            nonlocal last_y
+
+            # A trapezoid with no height covers no rows of its own, and the
+            # next one starts at the same y.  Only the top one still owns the
+            # row along its edge.
+            if D.y == A.y or C.y == B.y:
+                if not do_top:
+                    return
+                dx1 = 0.0
+                dx2 = 0.0
+            else:
+                dx1 = (D.x - A.x) / (D.y - A.y)
+                dx2 = (C.x - B.x) / (C.y - B.y)
 
             x1 = A.x
-            dx1 = (D.x - A.x) / (D.y - A.y)
             x2 = B.x
-            dx2 = (C.x - B.x) / (C.y - B.y)
             ymin = A.y
             ymax = C.y
 
@@ -260,40 +622,18 @@ class IsohedralTiling:
                 ymax = ymax + 1.0
 
             y = math.floor(ymin)
-            if self._last_y:
-                y = max(self._last_y, y)
+            if last_y:
+                y = max(last_y, y)
 
             while y < ymax:
-                yi = math.trunc(y)
-                x = math.floor(x1)
-                while x < (x2 + 1e-7):
-                    xi = math.trunc(x)
-
-                    for asp in range(ttd.num_aspects):
-                        M = copy.deepcopy(aspects[asp])
-                        M[2] += xi * t1.x + yi * t2.x
-                        M[5] += xi * t1.y + yi * t2.y
-
-                        yield Shape(
-                            **{
-                                "T": M,
-                                "id": False,
-                                "shape": False,
-                                "rev": False,
-                                "second": False,
-                                "t1": xi,
-                                "t2": yi,
-                                "aspect": asp,
-                            }
-                        )
-
-                    x += 1.0
+                # Columns run from floor(x1) while x < x2 + 1e-7.
+                yield math.trunc(y), math.floor(x1), math.ceil(x2 + 1e-7) - 1
 
                 x1 += dx1
                 x2 += dx2
                 y += 1.0
 
-            self._last_y = y
+            last_y = y
 
         def fill_fix_x(A, B, C, D, do_top):
             if A.x > B.x:
@@ -349,6 +689,166 @@ class IsohedralTiling:
                 yield from fill_fix_x(l1, right, r2, left, False)
                 yield from fill_fix_x(left, r2, top, top, True)
 
+    def _lattice_matrix(self):
+        # Maps world coordinates to (t1, t2) lattice coordinates.
+        t1 = self._t1
+        t2 = self._t2
+        det = 1.0 / (t1.x * t2.y - t2.x * t1.y)
+        return [t2.y * det, -t2.x * det, 0.0, -t1.y * det, t1.x * det, 0.0]
+
+    def _cell_footprint(self, Mbc):
+        # Lattice-space bounding box of the tiles belonging to cell (0, 0).
+        # Bezier curves stay inside their control polygons, so the control
+        # points bound the curved edges too.
+        ctrl = [p for seg in edge_segments(self) for p in seg]
+        pts = [mul(Mbc, p) for M in self._aspects for p in transform_points(M, ctrl)]
+        return bounds(pts)
+
+    def fill_region_polygon(self, points: List[Point], cull: bool = False, steps: int = 8):
+
+        # Scan-convert an arbitrary simple polygon in lattice space, one row
+        # of cells at a time, emitting only cells whose tiles' bounding box
+        # reaches the polygon.  With `cull`, tiles are also tested one by
+        # one against the polygon using their flattened outlines.
+        t1 = self._t1
+        t2 = self._t2
+        aspects = self._aspects
+        na = self.num_aspects
+
+        points = [Point(*p) for p in points]
+        Mbc = self._lattice_matrix()
+        region = [mul(Mbc, p) for p in points]
+        fx0, fy0, fx1, fy1 = self._cell_footprint(Mbc)
+        _, ymin, _, ymax = bounds(region)
+
+        if cull:
+            outline = self.outline(steps)
+            shapes = [transform_points(M, outline) for M in aspects]
+
+        for yi in range(math.floor(ymin - fy1), math.ceil(ymax - fy0) + 1):
+            last = None
+            for lo, hi in strip_spans(region, yi + fy0, yi + fy1):
+                start = math.ceil(lo - fx1)
+                end = math.floor(hi - fx0)
+                if last is not None:
+                    start = max(start, last + 1)
+
+                for xi in range(start, end + 1):
+                    for asp in range(na):
+                        M = cell_transform(aspects[asp], t1, t2, xi, yi)
+
+                        if cull:
+                            dx = M[2] - aspects[asp][2]
+                            dy = M[5] - aspects[asp][5]
+                            tile = [Point(p.x + dx, p.y + dy) for p in shapes[asp]]
+                            if not polygons_intersect(tile, points):
+                                continue
+
+                        yield tile_shape(M, xi, yi, asp)
+
+                last = max(end, last) if last is not None else end
+
+    def fill_region_hierarchical(self, xmin: float, ymin: float, xmax: float, ymax: float,
+                                 visible: Callable[[float, float, float, float], bool] = None):
+
+        # Quadtree fill for huge, sparsely visible regions.  The lattice
+        # cells that can reach the rectangle are split recursively, larger
+        # side first; each block's tiles are bounded by one world-space box,
+        # and blocks whose box misses the rectangle or fails
+        # visible(x0, y0, x1, y1) are dropped whole.  The predicate must be
+        # conservative: True whenever any part of the box may be visible.
+        # Tiles come out block by block rather than in scanline order.
+        t1 = self._t1
+        t2 = self._t2
+        aspects = self._aspects
+        na = self.num_aspects
+
+        Mbc = self._lattice_matrix()
+        fx0, fy0, fx1, fy1 = self._cell_footprint(Mbc)
+        lx0, ly0, lx1, ly1 = bounds([mul(Mbc, p) for p in rect_quad(xmin, ymin, xmax, ymax)])
+
+        # World-space box of cell (0, 0)'s tiles, translated per block by
+        # the extreme lattice offsets.
+        ctrl = [p for seg in edge_segments(self) for p in seg]
+        wx0, wy0, wx1, wy1 = bounds([p for M in aspects for p in transform_points(M, ctrl)])
+
+        def block_box(a0, b0, a1, b1):
+            xs = (a0 * t1.x + b0 * t2.x, a1 * t1.x + b0 * t2.x, a0 * t1.x + b1 * t2.x, a1 * t1.x + b1 * t2.x)
+            ys = (a0 * t1.y + b0 * t2.y, a1 * t1.y + b0 * t2.y, a0 * t1.y + b1 * t2.y, a1 * t1.y + b1 * t2.y)
+            return (
+                max(xmin, wx0 + min(xs)), max(ymin, wy0 + min(ys)),
+                min(xmax, wx1 + max(xs)), min(ymax, wy1 + max(ys)),
+            )
+
+        # Blocks are inclusive ranges of cells [a0, a1] x [b0, b1], popped
+        # so that the first half of every split is visited first.
+        stack = [(
+            math.floor(lx0 - fx1), math.floor(ly0 - fy1),
+            math.ceil(lx1 - fx0), math.ceil(ly1 - fy0),
+        )]
+        while stack:
+            a0, b0, a1, b1 = stack.pop()
+            x0, y0, x1, y1 = block_box(a0, b0, a1, b1)
+            if x0 > x1 or y0 > y1:
+                continue
+            if visible is not None and not visible(x0, y0, x1, y1):
+                continue
+
+            if a0 < a1 or b0 < b1:
+                if a1 - a0 >= b1 - b0:
+                    mid = (a0 + a1) // 2
+                    stack.append((mid + 1, b0, a1, b1))
+                    stack.append((a0, b0, mid, b1))
+                else:
+                    mid = (b0 + b1) // 2
+                    stack.append((a0, mid + 1, a1, b1))
+                    stack.append((a0, b0, a1, mid))
+                continue
+
+            for asp in range(na):
+                yield tile_shape(cell_transform(aspects[asp], t1, t2, a0, b0), a0, b0, asp)
+
+    def fill_region_clipped(self, points: List[Point], steps: int = 8):
+
+        # Tiles of a convex region with their flattened outlines cut to its
+        # boundary, as (Shape, outline) pairs.  Outlines are translated
+        # copies of one per aspect, so their bounding boxes are known up
+        # front: tiles boxed inside the region keep the whole outline, and
+        # only tiles on the boundary go through clip_polygon.
+        points = [Point(*p) for p in points]
+        if not is_convex(points):
+            raise ValueError("fill_region_clipped needs a convex region with positive area.")
+
+        outline = self.outline(steps)
+        shapes = [transform_points(M, outline) for M in self._aspects]
+        boxes = [bounds(pts) for pts in shapes]
+        rx0, ry0, rx1, ry1 = bounds(points)
+
+        for tile in self.fill_region_polygon(points):
+            asp = tile.aspect
+            dx = tile.T[2] - self._aspects[asp][2]
+            dy = tile.T[5] - self._aspects[asp][5]
+            x0, y0, x1, y1 = boxes[asp]
+            x0 += dx
+            y0 += dy
+            x1 += dx
+            y1 += dy
+
+            if x1 < rx0 or rx1 < x0 or y1 < ry0 or ry1 < y0:
+                continue
+
+            # A convex region holds the whole box if it holds its corners.
+            pts = [Point(p.x + dx, p.y + dy) for p in shapes[asp]]
+            inside = rx0 <= x0 and x1 <= rx1 and ry0 <= y0 and y1 <= ry1 and all(
+                point_in_polygon(c, points)
+                for c in (Point(x0, y0), Point(x1, y0), Point(x1, y1), Point(x0, y1)))
+
+            if not inside:
+                pts = clip_polygon(pts, points)
+                if not pts:
+                    continue
+            yield tile, pts
+
     def get_color(self, a, b, asp):
 
         clrg = self.ttd.coloring
@@ -371,3 +871,158 @@ class IsohedralTiling:
             col = clrg[15 + col]
 
         return col
+
+
+class TileRegion:
+
+    # Random access into the tile sequence of a quad fill.  The scanline
+    # rows are walked once to build per-row prefix counts; after that any
+    # tile index is located by bisection in O(log rows).
+
+    def __init__(self, tiling: IsohedralTiling, quad):
+        self._t1 = tiling.t1
+        self._t2 = tiling.t2
+        self._aspects = [list(M) for M in tiling.aspects]
+        self._na = tiling.num_aspects
+
+        self.rows = []
+        self.prefix_counts = array('q', [0])
+        for yi, xlo, xhi in tiling._fill_rows(*quad):
+            if xhi >= xlo:
+                self.rows.append((yi, xlo, xhi))
+                self.prefix_counts.append(self.prefix_counts[-1] + (xhi - xlo + 1) * self._na)
+
+    def __len__(self):
+        return self.prefix_counts[-1]
+
+    def _shape(self, xi, yi, asp):
+        return tile_shape(cell_transform(self._aspects[asp], self._t1, self._t2, xi, yi), xi, yi, asp)
+
+    def tile(self, k: int):
+        n = len(self)
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError(f"Tile index {k} is out of range for a region of {n} tiles.")
+
+        row = bisect_right(self.prefix_counts, k) - 1
+        yi, xlo, _ = self.rows[row]
+        offset = k - self.prefix_counts[row]
+        return self._shape(xlo + offset // self._na, yi, offset % self._na)
+
+    def slice(self, start: int, stop: int = None):
+        n = len(self)
+        start, stop, _ = slice(start, stop).indices(n)
+        if start >= stop:
+            return
+
+        row = bisect_right(self.prefix_counts, start) - 1
+        offset = start - self.prefix_counts[row]
+        remaining = stop - start
+
+        for yi, xlo, xhi in self.rows[row:]:
+            for xi in range(xlo + offset // self._na, xhi + 1):
+                for asp in range(offset % self._na, self._na):
+                    yield self._shape(xi, yi, asp)
+                    remaining -= 1
+                    if remaining == 0:
+                        return
+                offset = 0
+
+
+def _check_dtype(dtype):
+    if dtype not in FLOAT_DTYPES:
+        raise ValueError(f"Unsupported dtype '{dtype}'; expected one of {', '.join(FLOAT_DTYPES)}.")
+
+
+def _restore_tiling(tp, params, curves):
+    tiling = IsohedralTiling.__new__(IsohedralTiling)
+    tiling._tiling_type = tp
+    tiling.ttd = TilingTypeData.get_data(tp)
+    tiling._parameters = params
+    tiling._edge_curves = [[Point(*p) for p in ej] for ej in curves]
+    tiling._recompute()
+    return tiling
+
+
+# Read-only snapshot of the geometry computed by IsohedralTiling._recompute.
+TilingState = namedtuple('TilingState', [
+    'tiling_type',
+    'parameters',
+    'vertices',
+    'edges',
+    'reversals',
+    'aspects',
+    't1',
+    't2',
+    ])
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class TilingCache:
+
+    # Bounded LRU of TilingState keyed by (tiling type, parameters).  Safe
+    # to share between threads; the states it hands out are immutable.
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, tp: Tiling, params: List[float] = None):
+        key = (tp, None if params is None else tuple(params))
+
+        with self._lock:
+            state = self._entries.get(key)
+            if state is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return state
+            self._misses += 1
+
+        # Build outside the lock so that misses don't serialize each other.
+        tiling = IsohedralTiling(tp)
+        if params is not None:
+            tiling.parameters = list(params)
+
+        state = TilingState(
+            tiling_type=tp,
+            parameters=tuple(tiling.parameters),
+            vertices=tuple(tiling.vertices),
+            edges=tuple(tuple(T) for T in tiling.edges),
+            reversals=tuple(tiling.reversals),
+            aspects=tuple(tuple(M) for M in tiling.aspects),
+            t1=tiling.t1,
+            t2=tiling.t2,
+        )
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing
+
+            self._entries[key] = state
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return state
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+tiling_cache = TilingCache()
@@ -1827,7 +1827,21 @@ class TilingTypeData:
 
     _data = [Tiling(**datum) if datum is not None else None for datum in _data]    
 
+    _evaluators = {}
+
     @staticmethod
     def get_data(key):
 
         return TilingTypeData._data[key]
+
+    @staticmethod
+    def get_evaluator(key):
+
+        # Specialized evaluation code for this tiling type, generated on
+        # first use.  See codegen.py.
+        evaluate = TilingTypeData._evaluators.get(key)
+        if evaluate is None:
+            from .codegen import compile_evaluator
+            evaluate = compile_evaluator(key, TilingTypeData._data[key])
+            TilingTypeData._evaluators[key] = evaluate
+        return evaluate
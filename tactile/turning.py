@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from .preamble import Point
+from .geometry import polygon_area
+
+from array import array
+import cmath
+import math
+
+
+# Turning functions (Arkin et al.) of prototile outlines, sampled at a fixed
+# number of evenly spaced arc-length positions.  The distance between two
+# descriptors is minimized over rotation and starting point; the minimum
+# over all cyclic shifts comes from one FFT cross-correlation, so each
+# comparison costs O(n log n) in the number of samples.
+
+
+def _fft(a, invert=False):
+    n = len(a)
+    a = list(a)
+
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            a[i], a[j] = a[j], a[i]
+
+    length = 2
+    while length <= n:
+        half = length // 2
+        ang = (2.0 if invert else -2.0) * math.pi / length
+        twiddles = [cmath.exp(1j * ang * k) for k in range(half)]
+        for i in range(0, n, length):
+            for k in range(half):
+                u = a[i + k]
+                v = a[i + k + half] * twiddles[k]
+                a[i + k] = u + v
+                a[i + k + half] = u - v
+        length <<= 1
+
+    if invert:
+        return [z / n for z in a]
+    return a
+
+
+def turning_values(pts, samples: int = 128):
+    pts = [Point(*p) for p in pts]
+    if polygon_area(pts) < 0.0:
+        pts = pts[::-1]
+
+    n = len(pts)
+    headings = []
+    lengths = []
+    angle = None
+    for i in range(n):
+        p = pts[i]
+        q = pts[(i + 1) % n]
+        length = math.hypot(q.x - p.x, q.y - p.y)
+        if length == 0.0:
+            continue
+        a = math.atan2(q.y - p.y, q.x - p.x)
+        if angle is None:
+            angle = a
+        else:
+            # Unwrap so that each turn lies in (-pi, pi].
+            turn = (a - angle) % (2.0 * math.pi)
+            if turn > math.pi:
+                turn -= 2.0 * math.pi
+            angle += turn
+        headings.append(angle)
+        lengths.append(length)
+
+    # Total turning, including the turn from the last edge back to the first.
+    closing = (headings[0] - headings[-1]) % (2.0 * math.pi)
+    if closing > math.pi:
+        closing -= 2.0 * math.pi
+    winding = headings[-1] + closing - headings[0]
+
+    total = sum(lengths)
+    values = array('d')
+    i = 0
+    walked = lengths[0]
+    for k in range(samples):
+        s = total * (k + 0.5) / samples
+        while i < len(lengths) - 1 and walked < s:
+            i += 1
+            walked += lengths[i]
+        values.append(headings[i])
+
+    return values, winding
+
+
+class TurningFunction:
+
+    def __init__(self, pts, samples: int = 128):
+        if samples & (samples - 1):
+            raise ValueError(f"The number of samples must be a power of two, but {samples} was passed.")
+
+        self.values, self.winding = turning_values(pts, samples)
+
+        # Everything the distance needs that depends on one side only.
+        self.spectrum = _fft(self.values)
+        self.total = math.fsum(self.values)
+        self.sq_total = math.fsum(v * v for v in self.values)
+        self.prefix = [0.0]
+        for v in self.values:
+            self.prefix.append(self.prefix[-1] + v)
+
+    def __len__(self):
+        return len(self.values)
+
+    def distance(self, other: 'TurningFunction'):
+        if len(self) != len(other):
+            raise ValueError(f"Cannot compare turning functions with {len(self)} and {len(other)} samples.")
+
+        # Shifting our start by k samples wraps the first k values around,
+        # raising them by the total turning W.  For every shift k:
+        #   sum h^2  = sum f^2 + sum_{j<k} (2 W f_j + W^2)
+        #   sum h g  = corr(f, g)[k] + W * (sum of the last k values of g)
+        #   sum h    = sum f + k W
+        # and the best rotation removes the squared mean of h - g.
+        n = len(self)
+        W = self.winding
+        corr = _fft([a * b.conjugate() for a, b in zip(self.spectrum, other.spectrum)], invert=True)
+
+        best = math.inf
+        for k in range(n):
+            sum_hh = self.sq_total + 2.0 * W * self.prefix[k] + k * W * W
+            sum_hg = corr[k].real + W * (other.total - other.prefix[n - k])
+            diff = self.total + k * W - other.total
+            d = sum_hh - 2.0 * sum_hg + other.sq_total - diff * diff / n
+            best = min(best, d)
+
+        return math.sqrt(max(0.0, best) / n)
+
+
+def turning_functions(tilings, samples: int = 128, steps: int = 8):
+    return [TurningFunction(tiling.outline(steps), samples) for tiling in tilings]
+
+
+def pairwise_distances(descriptors):
+    # Condensed upper triangle, in the order (0,1), (0,2), ..., (1,2), ...
+    ret = array('d')
+    for i, a in enumerate(descriptors):
+        for b in descriptors[i + 1:]:
+            ret.append(a.distance(b))
+    return ret